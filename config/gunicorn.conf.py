@@ -0,0 +1,58 @@
+"""
+Gunicorn settings of the production serving mode (`manage.py serve`).
+Every value can be overridden through the environment.
+"""
+import multiprocessing
+import os
+import tempfile
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Sync WSGI workers with threads by default, uvicorn workers for ASGI
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(
+    os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1)
+)
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Import Django once in the master, workers fork with it loaded
+preload_app = True
+
+# Recycle workers gracefully to bound memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 200))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+accesslog = "-"
+errorlog = "-"
+
+# Workers publish their metrics through this directory, stale files
+# of a previous run are removed before the workers start
+if not os.environ.get("METRICS_MULTIPROC_DIR"):
+    os.environ["METRICS_MULTIPROC_DIR"] = tempfile.mkdtemp(
+        prefix="theatre-metrics-"
+    )
+
+
+def on_starting(server):
+    directory = os.environ["METRICS_MULTIPROC_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    for filename in os.listdir(directory):
+        if filename.endswith(".json"):
+            os.remove(os.path.join(directory, filename))
+
+
+def worker_exit(server, worker):
+    # Publish the counts since the last periodic flush
+    from theatre.metrics import registry
+
+    registry.flush()
+
+
+def child_exit(server, worker):
+    # Runs in the master before the pid can be reused by a new worker
+    from theatre.metrics import archive_process
+
+    archive_process(os.environ["METRICS_MULTIPROC_DIR"], worker.pid)
@@ -24,12 +24,15 @@ load_dotenv(BASE_DIR / ".env")
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-xk78c&jgr%6lnbx@=zbt(h7ee0i_nq&1y#b!@sifca!89xhzxs'
+SECRET_KEY = os.environ.get(
+    "SECRET_KEY",
+    'django-insecure-xk78c&jgr%6lnbx@=zbt(h7ee0i_nq&1y#b!@sifca!89xhzxs',
+)
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.environ.get("DEBUG", "True") == "True"
 
-ALLOWED_HOSTS = ["*"]
+ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS", "*").split(",")
 
 
 # Application definition
@@ -48,6 +51,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'theatre.instrumentation.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,12 +64,20 @@ MIDDLEWARE = [
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "theatre.throttling.AnonTokenBucketThrottle",
+        "theatre.throttling.UserTokenBucketThrottle",
+        "theatre.throttling.ScopedTokenBucketThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "10/day", "user": "30/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": os.environ.get("THROTTLE_ANON_RATE", "10/day"),
+        "user": os.environ.get("THROTTLE_USER_RATE", "30/day"),
+        "seat_browsing": os.environ.get(
+            "THROTTLE_SEAT_BROWSING_RATE", "120/min"
+        ),
+        "reservations": os.environ.get("THROTTLE_RESERVATIONS_RATE", "10/min"),
+    },
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
 }
 
@@ -100,9 +112,51 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "mypassword"),
         "HOST": os.environ.get("POSTGRES_HOST", "db"),
         "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        "CONN_MAX_AGE": int(os.environ.get("POSTGRES_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": (
+            os.environ.get("POSTGRES_CONN_HEALTH_CHECKS", "True") == "True"
+        ),
+    }
+}
+
+# psycopg connection pool, replaces persistent connections when enabled
+if os.environ.get("POSTGRES_POOL", "False") == "True":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("POSTGRES_POOL_MAX_SIZE", 10)),
+            "timeout": int(os.environ.get("POSTGRES_POOL_TIMEOUT", 10)),
+        }
+    }
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "theatre"),
     }
 }
 
+# Token buckets of theatre.throttling: the ThrottleBucket table, or
+# theatre.throttling.CacheThrottleStore on the THROTTLE_CACHE cache
+THROTTLE_STORE = os.environ.get(
+    "THROTTLE_STORE", "theatre.throttling.DatabaseThrottleStore"
+)
+THROTTLE_CACHE = os.environ.get("THROTTLE_CACHE", "default")
+# Read-only scopes serve cached pages and 304s, where an upsert per
+# request costs more than the response. Their buckets stay in the
+# THROTTLE_CACHE cache, shared by all workers only if the cache is.
+THROTTLE_SCOPE_STORES = {
+    "seat_browsing": os.environ.get(
+        "THROTTLE_SEAT_BROWSING_STORE",
+        "theatre.throttling.CacheThrottleStore",
+    ),
+}
+
+CATALOGUE_CACHE_TIMEOUT = int(os.environ.get("CATALOGUE_CACHE_TIMEOUT", 3600))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -132,6 +186,24 @@ LANGUAGE_CODE = 'en-us'
 MEDIA_URL = "/media/"
 MEDIA_ROOT = "/vol/web/media"
 
+# Media is stored under the hash of its content, see theatre.storage
+STORAGES = {
+    "default": {
+        "BACKEND": "theatre.storage.ContentAddressedStorage",
+    },
+    # Hashed static names are served with far-future cache headers,
+    # the manifest is written by collectstatic before `serve` starts
+    "staticfiles": {
+        "BACKEND": (
+            "django.contrib.staticfiles.storage.StaticFilesStorage" if DEBUG
+            else "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"
+        ),
+    },
+}
+
+# Threads per process rendering play image renditions, 0 renders inline
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", 2))
+
 TIME_ZONE = 'UTC'
 
 USE_I18N = True
@@ -143,6 +215,10 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = os.environ.get("STATIC_ROOT", "/vol/web/static")
+
+# Serve /media/ and /static/ from the app, see theatre.serving
+SERVE_FILES = os.environ.get("SERVE_FILES", "True") == "True"
 
 
 # Default primary key field type
@@ -155,3 +231,24 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": False,
 }
+
+# Verified access tokens kept per process, capped by the token lifetime
+JWT_AUTH_CACHE_SIZE = int(os.environ.get("JWT_AUTH_CACHE_SIZE", 10000))
+JWT_AUTH_CACHE_TTL = int(os.environ.get("JWT_AUTH_CACHE_TTL", 60))
+
+SEAT_HOLD_TTL = timedelta(
+    minutes=int(os.environ.get("SEAT_HOLD_TTL_MINUTES", 5))
+)
+
+# Time a hall is taken by one performance when checking schedule overlaps
+PERFORMANCE_DURATION = timedelta(
+    minutes=int(os.environ.get("PERFORMANCE_DURATION_MINUTES", 180))
+)
+
+# Repeats of one statement within a request logged as a possible N+1
+REQUEST_QUERY_THRESHOLD = int(os.environ.get("REQUEST_QUERY_THRESHOLD", 10))
+
+# Shared directory the worker processes aggregate their metrics through
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR") or None
+# Lets scrapers read the Prometheus endpoint without a staff account
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
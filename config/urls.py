@@ -14,11 +14,24 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from theatre.serving import serve_media, serve_static
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/theatre/", include("theatre.urls")),
     path("api/user/", include("user.urls")),
 ]
+
+if settings.SERVE_FILES:
+    urlpatterns += [
+        re_path(
+            rf"^{settings.MEDIA_URL.strip('/')}/(?P<path>.+)$", serve_media
+        ),
+        re_path(
+            rf"^{settings.STATIC_URL.strip('/')}/(?P<path>.+)$", serve_static
+        ),
+    ]
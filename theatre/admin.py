@@ -1,9 +1,8 @@
 from django.contrib import admin
-from django.db.models import Count
 from .models import (
     Play, Actor, Genre,
     TheatreHall, Performance,
-    Reservation, Ticket
+    Reservation, Ticket, SeatHold
 )
 
 
@@ -56,12 +55,10 @@ class PerformanceAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        return queryset.select_related("play", "theatre_hall").annotate(
-            _tickets_count=Count("tickets")
-        )
+        return queryset.select_related("play", "theatre_hall")
 
     def tickets_count(self, obj):
-        return obj._tickets_count
+        return obj.tickets_sold
     tickets_count.short_description = "Tickets Sold"
 
 
@@ -88,3 +85,13 @@ class TicketAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
         return queryset.select_related("performance", "reservation")
+
+
+@admin.register(SeatHold)
+class SeatHoldAdmin(admin.ModelAdmin):
+    list_display = ("performance", "row", "seat", "user", "expires_at")
+    list_filter = ("performance",)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.select_related("performance", "user")
@@ -0,0 +1,215 @@
+"""
+ASGI-native read endpoints for the schedule and the catalogue.
+They mirror the DRF viewsets but use the async ORM, so slow clients
+do not hold a worker thread while waiting on the database.
+"""
+import binascii
+import math
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Prefetch
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from theatre.models import Performance, Play, Ticket
+from theatre.pagination import (
+    TheatreCursorPagination,
+    PlayCursorPagination,
+    PerformanceCursorPagination,
+    decode_keyset_cursor,
+    encode_keyset_cursor,
+    keyset_filter,
+)
+from theatre.serializers import (
+    PerformanceDetailSerializer,
+    PerformanceListSerializer,
+    PerformanceSeatMapSerializer,
+    PlayDetailSerializer,
+    PlayListSerializer,
+)
+from theatre.views import PerformanceViewSet, PlayViewSet
+from user.authentication import get_token_user_cache
+
+
+class AuthenticationFailed(Exception):
+    pass
+
+
+async def authenticate(request):
+    """Resolve the JWT user of the request with an async user lookup"""
+    jwt_authentication = JWTAuthentication()
+    header = jwt_authentication.get_header(request)
+    if header is None:
+        return AnonymousUser()
+    raw_token = jwt_authentication.get_raw_token(header)
+    if raw_token is None:
+        return AnonymousUser()
+    user_cache = get_token_user_cache()
+    cached = user_cache.get(raw_token)
+    if cached is not None:
+        return cached[0]
+    try:
+        token = jwt_authentication.get_validated_token(raw_token)
+        user_id = token[api_settings.USER_ID_CLAIM]
+        user = await get_user_model().objects.aget(
+            is_active=True, **{api_settings.USER_ID_FIELD: user_id}
+        )
+    except (InvalidToken, TokenError, KeyError,
+            get_user_model().DoesNotExist):
+        raise AuthenticationFailed
+    user_cache.set(raw_token, token, user)
+    return user
+
+
+def _error(detail, status):
+    return JsonResponse({"detail": detail}, status=status)
+
+
+async def throttle_wait(request, viewset, action):
+    """
+    Run the throttles of the viewset action, so the async route spends
+    the same buckets as its DRF twin. Seconds to wait, 0 when allowed.
+    """
+    view = viewset(action=action)
+    for throttle in view.get_throttles():
+        if not await sync_to_async(throttle.allow_request)(request, view):
+            return throttle.wait()
+    return 0
+
+
+def async_endpoint(viewset, action, authenticated_only=False):
+    """
+    Authenticate and throttle the request like `action` of `viewset`
+    and translate lookup errors into the same JSON error bodies the
+    DRF views return
+    """
+    def decorator(view):
+        @require_GET
+        async def wrapper(request, *args, **kwargs):
+            try:
+                request.user = await authenticate(request)
+            except AuthenticationFailed:
+                return _error("Given token not valid for any token type", 401)
+            if authenticated_only and not request.user.is_authenticated:
+                return _error(
+                    "Authentication credentials were not provided.", 401
+                )
+            wait = await throttle_wait(request, viewset, action)
+            if wait:
+                response = _error(
+                    "Request was throttled. Expected available in "
+                    f"{math.ceil(wait)} seconds.",
+                    429,
+                )
+                response["Retry-After"] = str(math.ceil(wait))
+                return response
+            try:
+                return await view(request, *args, **kwargs)
+            except Http404:
+                return _error("No object found.", 404)
+            except (ValueError, binascii.Error):
+                return _error("Invalid query parameters.", 400)
+            except ValidationError as error:
+                return JsonResponse(error.detail, status=400)
+        return wrapper
+    return decorator
+
+
+async def _keyset_page(request, queryset, ordering, serializer_class):
+    # Clamped to [1, max_page_size], an empty page has no cursor row
+    page_size = max(1, min(
+        int(request.GET.get("page_size", TheatreCursorPagination.page_size)),
+        TheatreCursorPagination.max_page_size,
+    ))
+    cursor = request.GET.get("cursor")
+    if cursor:
+        queryset = queryset.filter(
+            keyset_filter(ordering, decode_keyset_cursor(cursor))
+        )
+    items = [
+        item async for item in queryset.order_by(*ordering)[:page_size + 1]
+    ]
+    next_url = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        params = request.GET.copy()
+        params["cursor"] = encode_keyset_cursor([
+            getattr(items[-1], field.lstrip("-")) for field in ordering
+        ])
+        next_url = request.build_absolute_uri(
+            f"{request.path}?{params.urlencode()}"
+        )
+    serializer = serializer_class(
+        items, many=True, context={"request": request}
+    )
+    return JsonResponse({"next": next_url, "results": serializer.data})
+
+
+async def _get_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404
+
+
+@async_endpoint(PerformanceViewSet, "list")
+async def performance_list(request):
+    queryset = PerformanceViewSet.filter_schedule(
+        PerformanceViewSet.queryset, request.GET
+    )
+    return await _keyset_page(
+        request,
+        queryset,
+        PerformanceCursorPagination.ordering,
+        PerformanceListSerializer,
+    )
+
+
+@async_endpoint(PerformanceViewSet, "retrieve")
+async def performance_detail(request, pk):
+    performance = await _get_or_404(
+        PerformanceViewSet.queryset.prefetch_related(
+            Prefetch("tickets", queryset=Ticket.objects.only(
+                "id", "row", "seat", "performance"
+            )),
+            "play__genres",
+            "play__actors",
+        ),
+        pk=pk,
+    )
+    serializer = PerformanceDetailSerializer(
+        performance, context={"request": request}
+    )
+    return JsonResponse(serializer.data)
+
+
+@async_endpoint(PerformanceViewSet, "seat_map")
+async def performance_seat_map(request, pk):
+    performance = await _get_or_404(
+        Performance.objects.select_related("theatre_hall"), pk=pk
+    )
+    return JsonResponse(PerformanceSeatMapSerializer(performance).data)
+
+
+@async_endpoint(PlayViewSet, "list", authenticated_only=True)
+async def play_list(request):
+    queryset = PlayViewSet.filter_catalogue(PlayViewSet.queryset, request.GET)
+    ordering = ("-search_rank", "id") if request.GET.get("q") else (
+        PlayCursorPagination.ordering
+    )
+    return await _keyset_page(
+        request, queryset, ordering, PlayListSerializer
+    )
+
+
+@async_endpoint(PlayViewSet, "retrieve", authenticated_only=True)
+async def play_detail(request, pk):
+    play = await _get_or_404(PlayViewSet.queryset, pk=pk)
+    serializer = PlayDetailSerializer(play, context={"request": request})
+    return JsonResponse(serializer.data)
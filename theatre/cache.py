@@ -0,0 +1,63 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CATALOGUE_VERSION_KEY = "theatre:catalogue:version"
+CATALOGUE_CACHE_TIMEOUT = getattr(settings, "CATALOGUE_CACHE_TIMEOUT", 60 * 60)
+
+
+def get_catalogue_version() -> int:
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        # A fresh timestamp never collides with versions of evicted keys
+        version = time.time_ns()
+        cache.add(CATALOGUE_VERSION_KEY, version, timeout=None)
+        version = cache.get(CATALOGUE_VERSION_KEY, version)
+    return version
+
+
+def bump_catalogue_version():
+    """Invalidate every cached catalogue response at once"""
+    try:
+        cache.incr(CATALOGUE_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOGUE_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def _normalize_ids(value: str) -> str:
+    try:
+        return ",".join(
+            str(id_) for id_ in sorted({int(str_id) for str_id in value.split(",")})
+        )
+    except ValueError:
+        return value
+
+
+def catalogue_cache_key(request, action: str, pk=None) -> str:
+    """
+    Build the response cache key from the catalogue version
+    and the normalized filter and pagination query params
+    """
+    params = request.query_params
+    parts = [
+        f"theatre:catalogue:{get_catalogue_version()}",
+        action,
+        str(pk),
+        request.get_host(),
+        " ".join(params.get("q", "").lower().split()),
+        params.get("title", "").strip().lower(),
+        _normalize_ids(params.get("genres", "")),
+        _normalize_ids(params.get("actors", "")),
+        params.get("cursor", ""),
+        params.get("page_size", ""),
+    ]
+    return ":".join(parts)
+
+
+def get_or_set_catalogue_response(cache_key: str, build_data):
+    data = cache.get(cache_key)
+    if data is None:
+        data = build_data()
+        cache.set(cache_key, data, CATALOGUE_CACHE_TIMEOUT)
+    return data
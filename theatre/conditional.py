@@ -0,0 +1,48 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Answer If-None-Match / If-Modified-Since with 304
+    before the response is built and serialized
+    """
+
+    def get_conditional_state(self, request, *args, **kwargs):
+        """
+        Return (fingerprint, last_modified) of the requested resource,
+        or None to answer without validators
+        """
+        return None
+
+    def conditional_response(self, request, build_response, *args, **kwargs):
+        state = self.get_conditional_state(request, *args, **kwargs)
+        if state is None:
+            return build_response()
+        fingerprint, last_modified = state
+        # Each URL and representation gets its own validator
+        fingerprint = (
+            request.path,
+            request.GET.urlencode(),
+            getattr(request, "accepted_media_type", None),
+            fingerprint,
+        )
+        etag = quote_etag(
+            hashlib.sha1(str(fingerprint).encode()).hexdigest()
+        )
+        last_modified = (
+            int(last_modified.timestamp()) if last_modified else None
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = build_response()
+        if not response.has_header("ETag"):
+            response["ETag"] = etag
+        if last_modified and not response.has_header("Last-Modified"):
+            response["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(response, ["Accept"])
+        return response
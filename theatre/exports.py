@@ -0,0 +1,185 @@
+"""
+Streaming CSV / NDJSON exports of sales data. Rows are read through
+a server-side cursor and sent in small chunks, so an export of any
+size runs in constant memory and starts sending bytes immediately.
+"""
+import csv
+import json
+from datetime import datetime, time, timedelta
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import (
+    Count,
+    Exists,
+    IntegerField,
+    OuterRef,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from theatre.models import Reservation, Ticket
+
+CHUNK_ROWS = 500
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+TICKET_COLUMNS = (
+    ("id", "id"),
+    ("reservation_id", "reservation_id"),
+    ("reserved_at", "reservation__created_at"),
+    ("user_email", "reservation__user__email"),
+    ("performance_id", "performance_id"),
+    ("play", "performance__play__title"),
+    ("theatre_hall", "performance__theatre_hall__name"),
+    ("show_time", "performance__show_time"),
+    ("row", "row"),
+    ("seat", "seat"),
+)
+RESERVATION_COLUMNS = (
+    ("id", "id"),
+    ("created_at", "created_at"),
+    ("user_email", "user__email"),
+    ("tickets", "tickets_count"),
+)
+
+
+def _parse_date(query_params, name):
+    value = query_params.get(name)
+    if not value:
+        return None
+    try:
+        date = datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValidationError({name: "Date must be in YYYY-MM-DD format"})
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+def _parse_performance(query_params):
+    value = query_params.get("performance")
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ValidationError({"performance": "Must be a performance id"})
+    return int(value)
+
+
+def filter_sold_between(queryset, query_params, created_at):
+    """Keep rows sold within [date_from, date_to], both days included"""
+    date_from = _parse_date(query_params, "date_from")
+    date_to = _parse_date(query_params, "date_to")
+    if date_from:
+        queryset = queryset.filter(**{f"{created_at}__gte": date_from})
+    if date_to:
+        queryset = queryset.filter(
+            **{f"{created_at}__lt": date_to + timedelta(days=1)}
+        )
+    return queryset
+
+
+def ticket_rows(query_params):
+    queryset = filter_sold_between(
+        Ticket.objects.order_by("id"),
+        query_params,
+        created_at="reservation__created_at",
+    )
+    performance_id = _parse_performance(query_params)
+    if performance_id is not None:
+        queryset = queryset.filter(performance_id=performance_id)
+    return queryset.values_list(*(field for _, field in TICKET_COLUMNS))
+
+
+def reservation_rows(query_params):
+    tickets = Ticket.objects.filter(reservation=OuterRef("pk")).order_by()
+    queryset = filter_sold_between(
+        Reservation.objects.order_by("id"),
+        query_params,
+        created_at="created_at",
+    )
+    performance_id = _parse_performance(query_params)
+    if performance_id is not None:
+        queryset = queryset.filter(
+            Exists(tickets.filter(performance_id=performance_id))
+        )
+    # A correlated count keeps rows streaming, GROUP BY would not
+    tickets_count = (
+        tickets.values("reservation")
+        .annotate(count=Count("id"))
+        .values("count")
+    )
+    return queryset.annotate(
+        tickets_count=Coalesce(
+            Subquery(tickets_count), 0, output_field=IntegerField()
+        )
+    ).values_list(*(field for _, field in RESERVATION_COLUMNS))
+
+
+EXPORTS = {
+    "tickets": (TICKET_COLUMNS, ticket_rows),
+    "reservations": (RESERVATION_COLUMNS, reservation_rows),
+}
+
+
+def _csv_chunks(header, rows):
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for index, row in enumerate(rows, start=1):
+        writer.writerow(
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        )
+        if index % CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _ndjson_chunks(header, rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder))
+        if len(lines) == CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def stream_export(export, export_format, query_params):
+    """Chunks of the encoded export, read with a server-side cursor"""
+    columns, rows = EXPORTS[export]
+    header = [name for name, _ in columns]
+    queryset = rows(query_params)
+    chunks = _csv_chunks if export_format == "csv" else _ndjson_chunks
+    return chunks(header, queryset.iterator(chunk_size=CHUNK_ROWS * 4))
+
+
+async def _async_chunks(chunks):
+    # The cursor belongs to the thread that opened it, so every read
+    # goes through the same thread-sensitive executor
+    read = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await read(chunks, None)) is not None:
+        yield chunk
+
+
+def export_response(request, export, export_format):
+    chunks = stream_export(export, export_format, request.query_params)
+    if isinstance(request._request, ASGIRequest):
+        # ASGI would buffer a sync iterator whole before sending it
+        chunks = _async_chunks(chunks)
+    response = StreamingHttpResponse(
+        chunks, content_type=CONTENT_TYPES[export_format]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{export}.{export_format}"'
+    )
+    return response
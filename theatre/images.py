@@ -0,0 +1,141 @@
+"""
+Background image pipeline of play posters: an uploaded original is
+decoded, resized to every rendition and re-encoded as WebP on a
+worker pool, so the upload request returns without waiting for it.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from theatre.cache import bump_catalogue_version
+from theatre.models import Play
+
+logger = logging.getLogger(__name__)
+
+# name: (width, height, crop to fill the box instead of fitting in it)
+RENDITIONS = {
+    "thumbnail": (200, 200, True),
+    "card": (600, 400, True),
+    "hero": (1600, 900, False),
+}
+WEBP_QUALITY = 80
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _reset_executor():
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+# Worker threads do not survive a fork, the child starts its own pool
+os.register_at_fork(after_in_child=_reset_executor)
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                thread_name_prefix="play-images",
+            )
+        return _executor
+
+
+def rendition_path(image_name, rendition):
+    stem, _ = os.path.splitext(os.path.basename(image_name))
+    return os.path.join("images", "renditions", f"{stem}-{rendition}.webp")
+
+
+def encode_renditions(file):
+    """Decode the original once and return {rendition: WebP bytes}"""
+    with Image.open(file) as original:
+        # JPEG can decode straight at a reduced scale
+        original.draft("RGB", (
+            max(width for width, _, _ in RENDITIONS.values()),
+            max(height for _, height, _ in RENDITIONS.values()),
+        ))
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    encoded = {}
+    for rendition, (width, height, crop) in RENDITIONS.items():
+        if crop:
+            resized = ImageOps.fit(image, (width, height), Image.LANCZOS)
+        else:
+            resized = image.copy()
+            resized.thumbnail((width, height), Image.LANCZOS)
+        buffer = BytesIO()
+        resized.save(buffer, format="WEBP", quality=WEBP_QUALITY)
+        encoded[rendition] = buffer.getvalue()
+    return encoded
+
+
+def process_play_image(play_id, image_name):
+    """
+    Render and store the renditions of a play image. Renditions that
+    are no longer referenced are left to collect_media_garbage, since
+    identical files are shared between plays.
+    """
+    with default_storage.open(image_name) as file:
+        encoded = encode_renditions(file)
+    renditions = {
+        rendition: default_storage.save(
+            rendition_path(image_name, rendition), ContentFile(content)
+        )
+        for rendition, content in encoded.items()
+    }
+    # Skip the result when the image was replaced in the meantime
+    updated = Play.objects.filter(pk=play_id, image=image_name).update(
+        image_renditions=renditions
+    )
+    if updated:
+        bump_catalogue_version()
+
+
+def _process_in_worker(play_id, image_name):
+    try:
+        process_play_image(play_id, image_name)
+    except Exception:
+        logger.exception("Rendering renditions of %s failed", image_name)
+    finally:
+        close_old_connections()
+
+
+def schedule_play_image(play):
+    """
+    Render the renditions of the play image once the transaction
+    commits, on the worker pool (or inline with IMAGE_WORKERS = 0).
+    Queued jobs die with the process, render_play_images picks up
+    images that are still without renditions.
+    """
+    if not play.image:
+        return
+    play_id, image_name = play.pk, play.image.name
+
+    def submit():
+        if settings.IMAGE_WORKERS:
+            get_executor().submit(_process_in_worker, play_id, image_name)
+        else:
+            process_play_image(play_id, image_name)
+
+    transaction.on_commit(submit)
+
+
+def rendition_urls(play, request=None):
+    """Absolute URLs of the renditions of a play image that are ready"""
+    urls = {}
+    for rendition, path in (play.image_renditions or {}).items():
+        url = default_storage.url(path)
+        urls[rendition] = request.build_absolute_uri(url) if request else url
+    return urls
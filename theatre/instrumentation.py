@@ -0,0 +1,257 @@
+"""
+Per-request instrumentation: query count, DB time, serializer time,
+render time and total latency of every view, reported in the
+Server-Timing header and aggregated in process-local histograms.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+
+from theatre.metrics import REQUEST_DURATION, THROTTLED_REQUESTS, registry
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        index = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound),
+            len(self.buckets),
+        )
+        self.counts[index] += 1
+        self.sum += value
+
+    def snapshot(self):
+        bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(bounds, self.counts)),
+            "sum": round(self.sum, 3),
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self.count = 0
+        self.max_queries = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.db_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.serialize_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.render_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+
+    def observe(self, timing):
+        self.count += 1
+        self.max_queries = max(self.max_queries, timing.queries)
+        self.latency_ms.observe(timing.total_ms)
+        self.db_ms.observe(timing.db_ms)
+        self.serialize_ms.observe(timing.serialize_ms)
+        self.render_ms.observe(timing.render_ms)
+        self.queries.observe(timing.queries)
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "max_queries": self.max_queries,
+            "latency_ms": self.latency_ms.snapshot(),
+            "db_ms": self.db_ms.snapshot(),
+            "serialize_ms": self.serialize_ms.snapshot(),
+            "render_ms": self.render_ms.snapshot(),
+            "queries": self.queries.snapshot(),
+        }
+
+
+class RequestMetrics:
+    """Thread-safe histograms of request timings keyed by view"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view, timing):
+        with self._lock:
+            self._views.setdefault(view, ViewMetrics()).observe(timing)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view: metrics.snapshot()
+                for view, metrics in sorted(self._views.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+request_metrics = RequestMetrics()
+
+
+class RequestTiming:
+    """Timings of a single request, fed by the DB execute wrapper"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.serialize_ms = 0.0
+        self.render_ms = 0.0
+        self.total_ms = 0.0
+        self.statements = Counter()
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - started) * 1000
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def timed_serialization(self, to_representation):
+        """Wrap a serializer's to_representation, minus its DB time"""
+        def wrapper(instance):
+            started, db_ms = time.perf_counter(), self.db_ms
+            try:
+                return to_representation(instance)
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                self.serialize_ms += elapsed - (self.db_ms - db_ms)
+        return wrapper
+
+    def render_started(self):
+        self._render_started = time.perf_counter()
+
+    def render_finished(self):
+        if self._render_started is not None:
+            self.render_ms = (time.perf_counter() - self._render_started) * 1000
+
+    def finish(self):
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        app_ms = max(
+            0.0,
+            self.total_ms - self.db_ms - self.serialize_ms - self.render_ms,
+        )
+        return ", ".join((
+            f'db;dur={self.db_ms:.2f};desc="{self.queries} queries"',
+            f"app;dur={app_ms:.2f}",
+            f"serialize;dur={self.serialize_ms:.2f}",
+            f"render;dur={self.render_ms:.2f}",
+            f"total;dur={self.total_ms:.2f}",
+        ))
+
+
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    view_name = match.view_name if match else "unresolved"
+    return f"{request.method} {view_name}"
+
+
+def serializer_label(response):
+    view = getattr(response, "renderer_context", {}).get("view")
+    try:
+        return view.get_serializer_class().__name__
+    except (AttributeError, AssertionError):
+        return "-"
+
+
+class SerializerTimingMixin:
+    """
+    Report the time views spend building serializer.data as its own
+    Server-Timing phase instead of folding it into app time
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        timing = getattr(self.request, "timing", None)
+        if timing is not None:
+            # Only the outermost call: nested fields run inside it
+            serializer.to_representation = timing.timed_serialization(
+                serializer.to_representation
+            )
+        return serializer
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Time every request and count its queries. Repeated statements
+    over REQUEST_QUERY_THRESHOLD are logged as likely N+1 offenders.
+    Async requests only report their total latency: their queries
+    run on other threads' connections.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timing = RequestTiming()
+        request.timing = timing
+        with connection.execute_wrapper(timing):
+            response = self.get_response(request)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        timing = RequestTiming()
+        request.timing = timing
+        response = await self.get_response(request)
+        return self.finish(request, response, timing)
+
+    def process_template_response(self, request, response):
+        timing = getattr(request, "timing", None)
+        if timing is not None:
+            timing.render_started()
+            response.add_post_render_callback(
+                lambda rendered: timing.render_finished()
+            )
+        return response
+
+    def finish(self, request, response, timing):
+        timing.finish()
+        view = view_label(request)
+        request_metrics.observe(view, timing)
+        REQUEST_DURATION.observe(timing.total_ms / 1000, view=view)
+        if response.status_code == 429:
+            THROTTLED_REQUESTS.inc(view=view)
+        registry.maybe_flush()
+        response["Server-Timing"] = timing.server_timing()
+        self.report_repeated_queries(view, response, timing)
+        return response
+
+    @staticmethod
+    def report_repeated_queries(view, response, timing):
+        if not timing.statements:
+            return
+        sql, repeats = timing.statements.most_common(1)[0]
+        if repeats < settings.REQUEST_QUERY_THRESHOLD:
+            return
+        logger.warning(
+            "Possible N+1 in %s (serializer %s): %d queries, statement "
+            "repeated %d times: %s",
+            view,
+            serializer_label(response),
+            timing.queries,
+            repeats,
+            sql,
+        )
@@ -0,0 +1,225 @@
+import itertools
+import json
+import platform
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from theatre.models import Genre, Performance, Play, Ticket
+from theatre.seeding import SeedConfig, TheatreSeeder
+
+
+@contextmanager
+def throttling_disabled():
+    """Benchmark traffic would exhaust the per-day throttle budgets"""
+    rates = SimpleRateThrottle.THROTTLE_RATES
+    saved = dict(rates)
+    rates.update({scope: None for scope in rates})
+    try:
+        yield
+    finally:
+        rates.clear()
+        rates.update(saved)
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    """
+    Django command to measure latency, throughput and query counts
+    of the browsing and booking hot paths under concurrency
+    """
+
+    help = (
+        "Benchmark /performances/, /performances/{id}/, /plays/ filters "
+        "and POST /reservations/ in-process and print a JSON report. "
+        "The reservations scenario writes tickets: use a benchmark database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", action="store_true",
+            help="Seed a synthetic dataset before measuring",
+        )
+        parser.add_argument("--plays", type=int, default=1000)
+        parser.add_argument("--performances-per-play", type=int, default=10)
+        parser.add_argument("--fill-ratio", type=float, default=0.5)
+        parser.add_argument("--random-seed", type=int, default=42)
+        parser.add_argument(
+            "--requests", type=int, default=200,
+            help="Requests per scenario",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8,
+            help="Concurrent client threads",
+        )
+        parser.add_argument(
+            "--skip-writes", action="store_true",
+            help="Do not run the reservation scenario",
+        )
+        parser.add_argument("--output", help="Write the report to a file")
+
+    def _scenarios(self, options):
+        performance_ids = list(
+            Performance.objects.order_by("?").values_list("id", flat=True)[:100]
+        )
+        genre_ids = list(Genre.objects.values_list("id", flat=True)[:3])
+        title = Play.objects.values_list("title", flat=True).first()
+        if not performance_ids or title is None:
+            raise CommandError("No data to benchmark, run with --seed")
+        performance_cycle = itertools.cycle(performance_ids)
+        genres = ",".join(str(genre_id) for genre_id in genre_ids)
+
+        scenarios = {
+            "performance_list": lambda client: client.get(
+                "/api/theatre/performances/"
+            ),
+            "performance_detail": lambda client: client.get(
+                f"/api/theatre/performances/{next(performance_cycle)}/"
+            ),
+            "play_list_genres": lambda client: client.get(
+                "/api/theatre/plays/", {"genres": genres}
+            ),
+            "play_list_title": lambda client: client.get(
+                "/api/theatre/plays/", {"title": title.split()[0]}
+            ),
+        }
+        if not options["skip_writes"]:
+            free_seats = self._free_seats(options["requests"])
+            lock = threading.Lock()
+
+            def reserve(client):
+                with lock:
+                    performance_id, row, seat = next(free_seats)
+                return client.post(
+                    "/api/theatre/reservations/",
+                    {"tickets": [{
+                        "row": row, "seat": seat, "performance": performance_id
+                    }]},
+                    format="json",
+                )
+            scenarios["reservation_create"] = reserve
+        return scenarios
+
+    @staticmethod
+    def _free_seats(count):
+        """Yield unsold seats, at most `count` of them"""
+        def seats():
+            performances = Performance.objects.select_related(
+                "theatre_hall"
+            ).order_by("tickets_sold", "id")
+            for performance in performances.iterator():
+                hall = performance.theatre_hall
+                for row in range(1, hall.rows + 1):
+                    for seat in range(1, hall.seats_in_row + 1):
+                        if not performance.is_seat_taken(row, seat):
+                            yield performance.id, row, seat
+        return itertools.islice(seats(), count)
+
+    def _run_scenario(self, request, user, requests, concurrency):
+        def worker(count):
+            client = APIClient()
+            client.force_authenticate(user=user)
+            results = []
+            try:
+                for _ in range(count):
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        try:
+                            status_code = request(client).status_code
+                        except StopIteration:
+                            break
+                        elapsed = time.perf_counter() - start
+                    results.append((elapsed, len(queries), status_code))
+            finally:
+                connections.close_all()
+            return results
+
+        shares = [
+            requests // concurrency + (index < requests % concurrency)
+            for index in range(concurrency)
+        ]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(itertools.chain.from_iterable(
+                executor.map(worker, shares)
+            ))
+        wall_time = time.perf_counter() - started
+
+        latencies = sorted(elapsed * 1000 for elapsed, _, _ in results)
+        query_counts = [queries for _, queries, _ in results]
+        errors = sum(1 for *_, status_code in results if status_code >= 400)
+        return {
+            "requests": len(results),
+            "concurrency": concurrency,
+            "errors": errors,
+            "throughput_rps": round(len(results) / wall_time, 2),
+            "latency_ms": {
+                "mean": round(statistics.mean(latencies), 3),
+                "p50": round(percentile(latencies, 0.5), 3),
+                "p95": round(percentile(latencies, 0.95), 3),
+                "p99": round(percentile(latencies, 0.99), 3),
+                "max": round(latencies[-1], 3),
+            },
+            "queries": {
+                "mean": round(statistics.mean(query_counts), 2),
+                "max": max(query_counts),
+            },
+        }
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            seeder = TheatreSeeder(
+                SeedConfig(
+                    plays=options["plays"],
+                    performances_per_play=options["performances_per_play"],
+                    fill_ratio=options["fill_ratio"],
+                    seed=options["random_seed"],
+                ),
+                log=lambda message: self.stderr.write(message),
+            )
+            seeder.run()
+
+        user, _ = get_user_model().objects.get_or_create(
+            email="benchmark@example.com", defaults={"is_staff": True}
+        )
+        report = {
+            "started_at": datetime.now(dt_timezone.utc).isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+            },
+            "dataset": {
+                "plays": Play.objects.count(),
+                "performances": Performance.objects.count(),
+                "tickets": Ticket.objects.count(),
+            },
+            "scenarios": {},
+        }
+        with throttling_disabled():
+            for name, request in self._scenarios(options).items():
+                self.stderr.write(f"Running {name}...")
+                report["scenarios"][name] = self._run_scenario(
+                    request, user, options["requests"], options["concurrency"]
+                )
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as report_file:
+                report_file.write(output + "\n")
+        self.stdout.write(output)
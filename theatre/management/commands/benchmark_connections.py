@@ -0,0 +1,68 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    """
+    Django command to compare per-request database latency of fresh
+    connections against the configured persistence / pooling settings
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests", type=int, default=200,
+            help="Simulated requests per mode",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print a JSON report",
+        )
+
+    @staticmethod
+    def _connection(alias, **overrides):
+        connections.settings[alias] = {
+            **connections.settings[DEFAULT_DB_ALIAS], **overrides
+        }
+        return connections[alias]
+
+    @staticmethod
+    def _measure(connection, requests):
+        """Time one SELECT per request lifecycle, connection setup included"""
+        timings = []
+        for _ in range(requests):
+            request_started.send(sender=__name__)
+            start = time.perf_counter()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            timings.append((time.perf_counter() - start) * 1000)
+            request_finished.send(sender=__name__)
+        connection.close()
+        timings.sort()
+        return {
+            "mean_ms": round(statistics.mean(timings), 3),
+            "p50_ms": round(timings[len(timings) // 2], 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        }
+
+    def handle(self, *args, **options):
+        fresh = self._connection(
+            "benchmark_fresh", CONN_MAX_AGE=0, OPTIONS={}
+        )
+        report = {
+            "fresh": self._measure(fresh, options["requests"]),
+            "configured": self._measure(
+                connections[DEFAULT_DB_ALIAS], options["requests"]
+            ),
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        for mode, stats in report.items():
+            self.stdout.write(
+                f"{mode:>10}: mean {stats['mean_ms']} ms, "
+                f"p50 {stats['p50_ms']} ms, p95 {stats['p95_ms']} ms"
+            )
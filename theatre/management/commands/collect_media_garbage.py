@@ -0,0 +1,81 @@
+import os
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from theatre.models import Play
+
+
+def walk_storage(storage, directory=""):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield os.path.join(directory, name)
+    for name in directories:
+        yield from walk_storage(storage, os.path.join(directory, name))
+
+
+class Command(BaseCommand):
+    """Django command to delete media files no play references anymore"""
+
+    help = (
+        "Delete play images and renditions that no Play references. "
+        "Files younger than --min-age are kept, they may belong to an "
+        "upload that is still in progress."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=3600,
+            help="Seconds since the last write before a file may be deleted",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the files that would be deleted",
+        )
+
+    def referenced_files(self):
+        referenced = set()
+        plays = Play.objects.exclude(image="").exclude(image=None)
+        for image, renditions in plays.values_list(
+            "image", "image_renditions"
+        ).iterator():
+            referenced.add(image)
+            referenced.update(renditions.values())
+        return referenced
+
+    def handle(self, *args, **options):
+        self.stdout.write("Collecting unreferenced media files...")
+        cutoff = timezone.now() - timedelta(seconds=options["min_age"])
+        # References are read first: re-uploading stored bytes refreshes
+        # the file age before the new reference is saved, so such a file
+        # is either referenced here or younger than the cutoff below
+        referenced = self.referenced_files()
+        names = (
+            walk_storage(default_storage, "images")
+            if default_storage.exists("images") else ()
+        )
+
+        deleted = freed = 0
+        for name in names:
+            if name in referenced:
+                continue
+            if default_storage.get_modified_time(name) >= cutoff:
+                continue
+            freed += default_storage.size(name)
+            deleted += 1
+            if options["dry_run"]:
+                self.stdout.write(f"Would delete {name}")
+            else:
+                default_storage.delete(name)
+
+        verb = "Would free" if options["dry_run"] else "Freed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {freed} bytes in {deleted} unreferenced file(s)"
+            )
+        )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from theatre.models import ThrottleBucket
+
+
+class Command(BaseCommand):
+    """Django command to delete throttle buckets that refilled completely"""
+
+    help = (
+        "Delete ThrottleBucket rows unused for --max-idle seconds. A missing "
+        "bucket counts as full, so keep --max-idle at least as long as the "
+        "longest throttle period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-idle",
+            type=int,
+            default=24 * 60 * 60,
+            help="Seconds since the last consumed token",
+        )
+
+    def handle(self, *args, **options):
+        deleted, _ = ThrottleBucket.objects.filter(
+            updated_at__lt=time.time() - options["max_idle"]
+        ).delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} idle throttle bucket(s)")
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F
+
+from theatre.models import Performance
+
+
+class Command(BaseCommand):
+    """Django command to fix tickets_sold counters that drifted from tickets"""
+
+    def handle(self, *args, **options):
+        self.stdout.write("Reconciling performance tickets counters...")
+        drifted = (
+            Performance.objects.annotate(_tickets_count=Count("tickets"))
+            .exclude(tickets_sold=F("_tickets_count"))
+        )
+        fixed = 0
+        for performance in drifted.iterator():
+            self.stdout.write(
+                f"Performance {performance.id}: "
+                f"{performance.tickets_sold} -> {performance._tickets_count}"
+            )
+            performance.rebuild_seat_map()
+            fixed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled {fixed} performance(s)")
+        )
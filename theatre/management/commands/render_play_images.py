@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from theatre.images import process_play_image
+from theatre.models import Play
+
+
+class Command(BaseCommand):
+    """Django command to render play image renditions that are missing"""
+
+    help = (
+        "Render the renditions of plays whose image has none, e.g. jobs "
+        "lost to a worker restart or images uploaded before renditions "
+        "existed. --all re-renders every play image."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also re-render plays that already have renditions",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rendering play image renditions...")
+        plays = Play.objects.exclude(image="").exclude(image=None)
+        if not options["all"]:
+            plays = plays.filter(image_renditions={})
+
+        rendered = failed = 0
+        for play_id, image_name in plays.values_list("pk", "image").iterator():
+            try:
+                process_play_image(play_id, image_name)
+            except Exception as error:
+                self.stderr.write(f"Play {play_id}: {error}")
+                failed += 1
+            else:
+                rendered += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered {rendered} play image(s), {failed} failed"
+            )
+        )
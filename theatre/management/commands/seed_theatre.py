@@ -0,0 +1,49 @@
+import json
+import time
+from dataclasses import fields
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from theatre.seeding import CopyTheatreSeeder, SeedConfig, TheatreSeeder
+
+
+class Command(BaseCommand):
+    """Django command to generate a deterministic synthetic theatre dataset"""
+
+    help = (
+        "Generate actors, genres, plays, halls, performances and sold "
+        "tickets in streamed batches. The same --seed yields the same data."
+    )
+
+    def add_arguments(self, parser):
+        for field in fields(SeedConfig):
+            parser.add_argument(
+                f"--{field.name.replace('_', '-')}",
+                type=type(field.default),
+                default=field.default,
+                dest=field.name,
+            )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Insert tickets with bulk_create even on Postgres",
+        )
+
+    def handle(self, *args, **options):
+        config = SeedConfig(
+            **{field.name: options[field.name] for field in fields(SeedConfig)}
+        )
+        seeder_class = (
+            CopyTheatreSeeder
+            if connection.vendor == "postgresql" and not options["no_copy"]
+            else TheatreSeeder
+        )
+        seeder = seeder_class(config, log=self.stdout.write)
+
+        self.stdout.write(f"Seeding theatre data with {seeder_class.__name__}...")
+        started = time.perf_counter()
+        summary = seeder.run()
+        summary["seconds"] = round(time.perf_counter() - started, 2)
+
+        self.stdout.write(self.style.SUCCESS(json.dumps(summary)))
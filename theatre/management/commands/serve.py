@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+ASGI_WORKER_CLASS = "uvicorn_worker.UvicornWorker"
+
+
+class Command(BaseCommand):
+    """Django command to run the project under a multi-process server"""
+
+    help = (
+        "Run the project with gunicorn, DEBUG off and the app preloaded. "
+        "Tuning is read from config/gunicorn.conf.py and the environment."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            help="Serve config.asgi with uvicorn workers",
+        )
+        parser.add_argument("--bind", help="Address to listen on")
+        parser.add_argument("--workers", type=int, help="Worker processes")
+        parser.add_argument("--threads", type=int, help="Threads per worker")
+        parser.add_argument(
+            "--skip-collectstatic",
+            action="store_true",
+            help="Serve the static files that were collected before",
+        )
+
+    def handle(self, *args, **options):
+        env = os.environ.copy()
+        env["DEBUG"] = "False"
+        overrides = {
+            "GUNICORN_BIND": options["bind"],
+            "WEB_CONCURRENCY": options["workers"],
+            "GUNICORN_THREADS": options["threads"],
+        }
+        if options["asgi"]:
+            overrides["GUNICORN_WORKER_CLASS"] = ASGI_WORKER_CLASS
+        env.update(
+            {name: str(value) for name, value in overrides.items()
+             if value is not None}
+        )
+
+        if not options["skip_collectstatic"]:
+            # Collected with DEBUG off, so the hashed manifest is written
+            self.stdout.write("Collecting static files...")
+            subprocess.run(
+                [sys.executable, "manage.py", "collectstatic", "--noinput"],
+                cwd=settings.BASE_DIR,
+                env=env,
+                check=True,
+            )
+
+        application = "config.asgi:application" if options["asgi"] else (
+            "config.wsgi:application"
+        )
+        config_file = os.path.join(settings.BASE_DIR, "config", "gunicorn.conf.py")
+        self.stdout.write(f"Starting gunicorn for {application}...")
+        os.execvpe(
+            "gunicorn",
+            ["gunicorn", "--config", config_file, application],
+            env,
+        )
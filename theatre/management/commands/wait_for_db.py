@@ -1,12 +1,20 @@
 import time
 from django.db import connections
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db.utils import OperationalError
 
 
 class Command(BaseCommand):
     """Django command to pause execution until database is available"""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pool-timeout",
+            type=float,
+            default=30,
+            help="Seconds to wait for the connection pool to fill min_size",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Waiting for database...")
         db_conn = None
@@ -18,3 +26,23 @@ class Command(BaseCommand):
                 time.sleep(1)
 
         self.stdout.write(self.style.SUCCESS("Database available!"))
+
+        pool = getattr(connections["default"], "pool", None)
+        if pool is not None:
+            from psycopg_pool import PoolTimeout
+
+            self.stdout.write("Warming up connection pool...")
+            try:
+                pool.wait(timeout=options["pool_timeout"])
+            except PoolTimeout as exc:
+                raise CommandError(
+                    f"Connection pool not ready after "
+                    f"{options['pool_timeout']} seconds: {exc}"
+                )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Connection pool ready "
+                    f"({pool.get_stats().get('pool_size', pool.min_size)} "
+                    f"connections)"
+                )
+            )
@@ -0,0 +1,311 @@
+"""
+In-process metrics registry rendered in the Prometheus text format.
+
+Every thread increments its own shard, so the hot path takes no lock;
+shards are summed on scrape. With METRICS_MULTIPROC_DIR set, each
+process periodically writes its totals to a file there and a scrape
+served by any worker adds up the files of all workers. The files of
+exited workers are folded into one archive file, so their counts
+survive worker recycling.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+ARCHIVE_FILENAME = "archive.json"
+
+
+class Metric:
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _labels(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        self.registry.add((self.name, "", self._labels(labels)), amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames=(),
+                 buckets=DURATION_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        label_values = self._labels(labels)
+        bucket = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound),
+            len(self.buckets),
+        )
+        add = self.registry.add
+        add((self.name, f"bucket:{bucket}", label_values), 1)
+        add((self.name, "sum", label_values), value)
+        add((self.name, "count", label_values), 1)
+
+
+def _escape(value):
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(
+        f'{name}="{_escape(value)}"' for name, value in pairs
+    ) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def _dump(directory, path, data):
+    """Write atomically, a scrape never reads a partial file"""
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(descriptor, "w") as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+
+def _add_totals(totals, data):
+    for (name, suffix, labels), value in data:
+        key = (name, suffix, tuple(labels))
+        totals[key] = totals.get(key, 0) + value
+
+
+def _serialize_totals(totals):
+    return [
+        [list(name_suffix_labels), value]
+        for name_suffix_labels, value in totals.items()
+    ]
+
+
+def archive_process(directory, pid):
+    """
+    Fold the last flush of an exited worker into the archive. The
+    archive names the pids it already holds until their files are
+    gone, so a scrape in between neither drops nor doubles them.
+    """
+    path = os.path.join(directory, f"{pid}.json")
+    archive_path = os.path.join(directory, ARCHIVE_FILENAME)
+    try:
+        exited = _load(path)
+    except (OSError, ValueError):
+        return
+    try:
+        archive = _load(archive_path)
+    except (OSError, ValueError):
+        archive = {"pids": [], "totals": []}
+    totals = {}
+    _add_totals(totals, archive["totals"])
+    _add_totals(totals, exited)
+    archive = {"pids": [str(pid)], "totals": _serialize_totals(totals)}
+    _dump(directory, archive_path, archive)
+    os.remove(path)
+    archive["pids"] = []
+    _dump(directory, archive_path, archive)
+
+
+class MetricsRegistry:
+    def __init__(self, flush_interval=1.0):
+        self.flush_interval = flush_interval
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._shards = []
+        self._flushed_at = 0.0
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(),
+                  buckets=DURATION_BUCKETS):
+        return self._register(
+            Histogram(self, name, documentation, labelnames, buckets)
+        )
+
+    def _register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def add(self, key, amount):
+        # Only the owning thread writes a shard, so no lock is needed
+        shard = self._shard()
+        shard[key] = shard.get(key, 0) + amount
+
+    def collect(self):
+        """Sum the shards of all threads of this process"""
+        with self._lock:
+            shards = list(self._shards)
+        totals = {}
+        for shard in shards:
+            for key, value in shard.copy().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def reset(self):
+        # Also runs in a freshly forked child, where the lock may be stale
+        self._lock = threading.Lock()
+        self._shards = []
+        self._local = threading.local()
+        self._flushed_at = 0.0
+
+    @staticmethod
+    def _directory():
+        return getattr(settings, "METRICS_MULTIPROC_DIR", None)
+
+    @staticmethod
+    def _path(directory):
+        return os.path.join(directory, f"{os.getpid()}.json")
+
+    def flush(self):
+        """Write this process totals for the other workers to aggregate"""
+        directory = self._directory()
+        if not directory:
+            return
+        self._flushed_at = time.monotonic()
+        _dump(
+            directory,
+            self._path(directory),
+            _serialize_totals(self.collect()),
+        )
+
+    def maybe_flush(self):
+        if time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def aggregate(self):
+        """Totals of this process plus the last flush of every other one"""
+        totals = self.collect()
+        directory = self._directory()
+        if not directory:
+            return totals
+        skipped = {os.path.basename(self._path(directory)), ARCHIVE_FILENAME}
+        try:
+            archive = _load(os.path.join(directory, ARCHIVE_FILENAME))
+        except (OSError, ValueError):
+            archive = {"pids": [], "totals": []}
+        _add_totals(totals, archive["totals"])
+        skipped.update(f"{pid}.json" for pid in archive["pids"])
+        for filename in os.listdir(directory):
+            if not filename.endswith(".json") or filename in skipped:
+                continue
+            try:
+                data = _load(os.path.join(directory, filename))
+            except (OSError, ValueError):
+                continue
+            _add_totals(totals, data)
+        return totals
+
+    def render(self):
+        totals = self.aggregate()
+        series = {}
+        for (name, suffix, labels), value in totals.items():
+            series.setdefault(name, {}).setdefault(labels, {})[suffix] = value
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            samples = series.get(name, {})
+            if not samples and not metric.labelnames:
+                samples = {(): {}}
+            for labels, values in sorted(samples.items()):
+                if metric.type == "counter":
+                    lines.append(
+                        f"{name}{_format_labels(metric.labelnames, labels)} "
+                        f"{_format_value(values.get('', 0))}"
+                    )
+                    continue
+                cumulative = 0
+                bounds = [repr(bound) for bound in metric.buckets] + ["+Inf"]
+                for index, bound in enumerate(bounds):
+                    cumulative += values.get(f"bucket:{index}", 0)
+                    lines.append(
+                        f"{name}_bucket"
+                        f"{_format_labels(metric.labelnames, labels, [('le', bound)])} "
+                        f"{cumulative}"
+                    )
+                label_text = _format_labels(metric.labelnames, labels)
+                lines.append(
+                    f"{name}_sum{label_text} "
+                    f"{_format_value(values.get('sum', 0))}"
+                )
+                lines.append(
+                    f"{name}_count{label_text} {values.get('count', 0)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+# A forked worker must not report the counts of its parent again
+os.register_at_fork(after_in_child=registry.reset)
+
+RESERVATIONS_CREATED = registry.counter(
+    "theatre_reservations_created_total", "Reservations created."
+)
+TICKETS_SOLD = registry.counter(
+    "theatre_tickets_sold_total", "Tickets sold through reservations."
+)
+RESERVATION_CONFLICTS = registry.counter(
+    "theatre_reservation_conflicts_total",
+    "Reservations rejected because a seat was already taken or held.",
+    ("reason",),
+)
+THROTTLED_REQUESTS = registry.counter(
+    "theatre_throttled_requests_total",
+    "Requests rejected by throttling.",
+    ("view",),
+)
+REQUEST_DURATION = registry.histogram(
+    "theatre_request_duration_seconds",
+    "Request latency by view.",
+    ("view",),
+)
+
+
+class PrometheusTextRenderer(BaseRenderer):
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data
+        return json.dumps(data)
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 08:36
+
+from django.db import migrations, models
+
+
+def fill_seat_maps(apps, schema_editor):
+    Performance = apps.get_model("theatre", "Performance")
+    Ticket = apps.get_model("theatre", "Ticket")
+    for performance in Performance.objects.select_related("theatre_hall"):
+        seats_in_row = performance.theatre_hall.seats_in_row
+        seat_map = bytearray(
+            (performance.theatre_hall.rows * seats_in_row + 7) // 8
+        )
+        tickets = Ticket.objects.filter(performance=performance)
+        for row, seat in tickets.values_list("row", "seat"):
+            byte_index, bit = divmod((row - 1) * seats_in_row + seat - 1, 8)
+            seat_map[byte_index] |= 1 << bit
+        performance.seat_map = bytes(seat_map)
+        performance.save(update_fields=["seat_map"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0002_alter_reservation_options_alter_ticket_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='performance',
+            name='seat_map',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(fill_seat_maps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0004_performance_tickets_sold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='performance',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
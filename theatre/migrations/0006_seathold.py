@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:05
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0005_performance_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('seat', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('expires_at', models.DateTimeField()),
+                ('performance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to='theatre.performance')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_holds', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['expires_at'],
+                'unique_together': {('performance', 'row', 'seat')},
+            },
+        ),
+    ]
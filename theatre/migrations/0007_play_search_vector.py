@@ -0,0 +1,75 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:30
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
+
+
+def fill_search_vectors(apps, schema_editor):
+    # The expression is frozen here, later changes to the model
+    # helper must not change what this migration builds
+    Play = apps.get_model("theatre", "Play")
+    genre_names = (
+        Play.genres.through.objects.filter(play_id=OuterRef("pk"))
+        .values("play_id")
+        .annotate(names=StringAgg("genre__name", " "))
+        .values("names")
+    )
+    actor_names = (
+        Play.actors.through.objects.filter(play_id=OuterRef("pk"))
+        .values("play_id")
+        .annotate(names=StringAgg(
+            Concat(
+                "actor__first_name", Value(" "), "actor__last_name",
+                output_field=models.TextField(),
+            ),
+            " ",
+        ))
+        .values("names")
+    )
+    Play.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config="english")
+            + SearchVector(
+                Coalesce(
+                    Subquery(genre_names), Value(""),
+                    output_field=models.TextField(),
+                ),
+                weight="B",
+                config="english",
+            )
+            + SearchVector(
+                Coalesce(
+                    Subquery(actor_names), Value(""),
+                    output_field=models.TextField(),
+                ),
+                weight="B",
+                config="english",
+            )
+            + SearchVector("description", weight="C", config="english")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0006_seathold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='play',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='play',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='theatre_pla_search__e0c061_gin'),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+    ]
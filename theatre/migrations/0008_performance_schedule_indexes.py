@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0007_play_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['show_time', 'id'], name='performance_show_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['play', 'show_time'], name='performance_play_show_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='performance',
+            index=models.Index(fields=['theatre_hall', 'show_time'], name='performance_hall_show_idx'),
+        ),
+    ]
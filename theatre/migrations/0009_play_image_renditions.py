@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0008_performance_schedule_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='play',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
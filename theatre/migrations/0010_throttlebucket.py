@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatre', '0009_play_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('tokens', models.FloatField()),
+                ('updated_at', models.FloatField(db_index=True)),
+            ],
+        ),
+        # Buckets are cheap to lose on a crash, skip the WAL for them
+        migrations.RunSQL(
+            'ALTER TABLE theatre_throttlebucket SET UNLOGGED',
+            reverse_sql='ALTER TABLE theatre_throttlebucket SET LOGGED',
+        ),
+    ]
@@ -1,10 +1,16 @@
 import os
 import uuid
 
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Concat
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.utils.text import slugify
 
 User = get_user_model()
@@ -33,16 +39,75 @@ def movie_image_file_path(instance, filename):
     return os.path.join("images", filename)
 
 
+def play_search_vector(play_model):
+    """
+    Full-text search vector expression of a play: title, genre names,
+    actor full names and description, ranked in that order
+    """
+    genre_names = (
+        play_model.genres.through.objects.filter(play_id=OuterRef("pk"))
+        .values("play_id")
+        .annotate(names=StringAgg("genre__name", " "))
+        .values("names")
+    )
+    actor_names = (
+        play_model.actors.through.objects.filter(play_id=OuterRef("pk"))
+        .values("play_id")
+        .annotate(names=StringAgg(
+            Concat(
+                "actor__first_name", Value(" "), "actor__last_name",
+                output_field=models.TextField(),
+            ),
+            " ",
+        ))
+        .values("names")
+    )
+    return (
+        SearchVector("title", weight="A", config="english")
+        + SearchVector(
+            Coalesce(
+                Subquery(genre_names), Value(""),
+                output_field=models.TextField(),
+            ),
+            weight="B",
+            config="english",
+        )
+        + SearchVector(
+            Coalesce(
+                Subquery(actor_names), Value(""),
+                output_field=models.TextField(),
+            ),
+            weight="B",
+            config="english",
+        )
+        + SearchVector("description", weight="C", config="english")
+    )
+
+
 class Play(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField()
     genres = models.ManyToManyField(Genre, blank=True)
     actors = models.ManyToManyField(Actor, blank=True)
     image = models.ImageField(null=True, upload_to=movie_image_file_path)
+    # Rendition name -> storage path, filled by theatre.images
+    image_renditions = models.JSONField(
+        default=dict, blank=True, editable=False
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def update_search_vector(cls, play_ids):
+        cls.objects.filter(pk__in=play_ids).update(
+            search_vector=play_search_vector(cls)
+        )
+
+    class Meta:
+        indexes = [GinIndex(fields=["search_vector"])]
+
 class TheatreHall(models.Model):
     name = models.CharField(max_length=100)
     rows = models.IntegerField()
@@ -66,10 +131,99 @@ class Performance(models.Model):
         related_name="performances"
     )
     show_time = models.DateTimeField()
+    seat_map = models.BinaryField(default=bytes, editable=False)
+    tickets_sold = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.play} {self.show_time}"
 
+    @staticmethod
+    def _seat_index(row: int, seat: int, seats_in_row: int) -> int:
+        return (row - 1) * seats_in_row + (seat - 1)
+
+    def is_seat_taken(self, row: int, seat: int) -> bool:
+        """Check seat occupancy against the bitmap, without a ticket query"""
+        index = self._seat_index(row, seat, self.theatre_hall.seats_in_row)
+        byte_index, bit = divmod(index, 8)
+        seat_map = bytes(self.seat_map)
+        return (
+            byte_index < len(seat_map)
+            and bool(seat_map[byte_index] >> bit & 1)
+        )
+
+    @classmethod
+    def update_seat_map(cls, performance_id, seats, taken=True):
+        """
+        Set (or clear) the bits of the given (row, seat) pairs
+        in the performance seat map and shift tickets_sold
+        by the number of seats that actually changed.
+        The performance row is locked, so concurrent writers
+        do not overwrite each other's bits.
+        """
+        with transaction.atomic():
+            performance = (
+                cls.objects.select_for_update(of=("self",))
+                .select_related("theatre_hall")
+                .filter(pk=performance_id)
+                .first()
+            )
+            if performance is None:
+                return
+            theatre_hall = performance.theatre_hall
+            seat_map = bytearray((theatre_hall.capacity + 7) // 8)
+            current = bytes(performance.seat_map)[:len(seat_map)]
+            seat_map[:len(current)] = current
+            changed = 0
+            for row, seat in seats:
+                # Seats cut off by a smaller hall have no bit
+                if not (
+                    1 <= row <= theatre_hall.rows
+                    and 1 <= seat <= theatre_hall.seats_in_row
+                ):
+                    continue
+                index = cls._seat_index(row, seat, theatre_hall.seats_in_row)
+                byte_index, bit = divmod(index, 8)
+                if bool(seat_map[byte_index] >> bit & 1) == taken:
+                    continue
+                seat_map[byte_index] ^= 1 << bit
+                changed += 1
+            cls.objects.filter(pk=performance_id).update(
+                seat_map=bytes(seat_map),
+                updated_at=timezone.now(),
+                tickets_sold=(
+                    models.F("tickets_sold") + changed if taken
+                    else models.F("tickets_sold") - changed
+                ),
+            )
+
+    def rebuild_seat_map(self):
+        """Recompute the seat map and tickets_sold from the tickets"""
+        with transaction.atomic():
+            Performance.objects.filter(pk=self.pk).update(
+                seat_map=b"", tickets_sold=0
+            )
+            Performance.update_seat_map(
+                self.pk, self.tickets.values_list("row", "seat")
+            )
+        self.refresh_from_db(fields=["seat_map", "tickets_sold"])
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["show_time", "id"],
+                name="performance_show_time_idx",
+            ),
+            models.Index(
+                fields=["play", "show_time"],
+                name="performance_play_show_idx",
+            ),
+            models.Index(
+                fields=["theatre_hall", "show_time"],
+                name="performance_hall_show_idx",
+            ),
+        ]
+
 
 class Reservation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -149,3 +303,49 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("performance", "row", "seat")
         ordering = ["row", "seat"]
+
+
+class SeatHold(models.Model):
+    """Short-lived lock of a seat by a user before checkout"""
+    row = models.IntegerField(
+        validators=[MinValueValidator(1)],
+    )
+    seat = models.IntegerField(
+        validators=[MinValueValidator(1)],
+    )
+    performance = models.ForeignKey(
+        Performance,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="seat_holds"
+    )
+    expires_at = models.DateTimeField()
+
+    @property
+    def is_active(self) -> bool:
+        return self.expires_at > timezone.now()
+
+    def __str__(self):
+        return (
+            f"{str(self.performance)} (row: {self.row}, seat: {self.seat}) "
+            f"held until {self.expires_at}"
+        )
+
+    class Meta:
+        unique_together = ("performance", "row", "seat")
+        ordering = ["expires_at"]
+
+
+class ThrottleBucket(models.Model):
+    """Token bucket of one throttle key, see theatre.throttling"""
+    key = models.CharField(max_length=255, primary_key=True)
+    tokens = models.FloatField()
+    # Unix time of the last consumed token
+    updated_at = models.FloatField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key}: {self.tokens:.2f} tokens"
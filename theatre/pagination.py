@@ -0,0 +1,59 @@
+import base64
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination
+
+
+class TheatreCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("id",)
+
+
+class PlayCursorPagination(TheatreCursorPagination):
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get("q"):
+            return ("-search_rank", "id")
+        return super().get_ordering(request, queryset, view)
+
+
+class PerformanceCursorPagination(TheatreCursorPagination):
+    ordering = ("show_time", "id")
+
+
+class ReservationCursorPagination(TheatreCursorPagination):
+    ordering = ("created_at", "id")
+
+
+def encode_keyset_cursor(values) -> str:
+    return base64.urlsafe_b64encode(
+        json.dumps(values, cls=DjangoJSONEncoder).encode()
+    ).decode()
+
+
+def decode_keyset_cursor(cursor: str) -> list:
+    """Raise ValueError for a malformed cursor"""
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_filter(ordering, values) -> Q:
+    """
+    Rows strictly after the cursor row for the given ordering,
+    e.g. ("show_time", "id") -> show_time > t OR (show_time = t AND id > i)
+    """
+    query = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        equal = {
+            previous.lstrip("-"): value
+            for previous, value in zip(ordering[:index], values)
+        }
+        query |= Q(**equal, **{f"{name}__{lookup}": values[index]})
+    return query
@@ -1,3 +1,6 @@
+import secrets
+
+from django.conf import settings
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
 
@@ -9,3 +12,13 @@ class IsAdminOrIfAuthenticatedReadOnly(BasePermission):
              )
             or (request.user and request.user.is_staff)
         )
+
+
+class HasMetricsToken(BasePermission):
+    """Let scrapers in with the METRICS_TOKEN in the X-Metrics-Token header"""
+
+    def has_permission(self, request, view):
+        token = settings.METRICS_TOKEN
+        return bool(token) and secrets.compare_digest(
+            request.headers.get("X-Metrics-Token", ""), token
+        )
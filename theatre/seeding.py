@@ -0,0 +1,325 @@
+"""
+Deterministic synthetic dataset generation for load tests and benchmarks.
+Rows are inserted with bulk_create in bounded batches, so memory use
+does not grow with the number of generated tickets.
+"""
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from theatre.cache import bump_catalogue_version
+from theatre.models import (
+    Actor,
+    Genre,
+    Play,
+    TheatreHall,
+    Performance,
+    Reservation,
+    Ticket,
+)
+
+FIRST_NAMES = (
+    "Anna", "Boris", "Clara", "Dmytro", "Eva", "Fedir", "Galyna", "Hugo",
+    "Iryna", "Jonas", "Kateryna", "Lev", "Maria", "Nazar", "Olena", "Petro",
+)
+LAST_NAMES = (
+    "Bondar", "Chen", "Dumas", "Evans", "Franko", "Garcia", "Horvat",
+    "Ivanenko", "Kowalski", "Lysenko", "Moreau", "Novak", "Shevchenko",
+)
+GENRE_NAMES = (
+    "Drama", "Comedy", "Tragedy", "Musical", "Opera", "Ballet",
+    "Farce", "Satire", "Melodrama", "Mystery", "Historical", "Absurdist",
+)
+TITLE_WORDS = (
+    "Night", "Garden", "King", "Storm", "Letter", "Mirror", "Forest",
+    "Winter", "Dream", "Bridge", "Shadow", "River", "Crown", "Masquerade",
+)
+SEASON_START = datetime(2026, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@dataclass
+class SeedConfig:
+    actors: int = 200
+    genres: int = 12
+    plays: int = 1000
+    halls: int = 20
+    performances_per_play: int = 10
+    users: int = 1000
+    fill_ratio: float = 0.5
+    min_rows: int = 10
+    max_rows: int = 40
+    min_seats_in_row: int = 15
+    max_seats_in_row: int = 40
+    tickets_per_reservation: int = 4
+    batch_size: int = 5000
+    seed: int = 42
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class TheatreSeeder:
+    """Generate a theatre catalogue, schedule and sold tickets"""
+
+    def __init__(self, config: SeedConfig, log=None):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.log = log or (lambda message: None)
+
+    def _bulk_create(self, model, objects):
+        created = []
+        for batch in batched(objects, self.config.batch_size):
+            created.extend(model.objects.bulk_create(batch))
+        return created
+
+    def seed_users(self):
+        """Create (or reuse, on a re-run with the same seed) buyer accounts"""
+        password = make_password(None)
+        email_prefix = f"seed-{self.config.seed}-"
+        for batch in batched(range(self.config.users), self.config.batch_size):
+            get_user_model().objects.bulk_create(
+                [
+                    get_user_model()(
+                        email=f"{email_prefix}{index}@example.com",
+                        password=password,
+                        is_staff=False,
+                    )
+                    for index in batch
+                ],
+                ignore_conflicts=True,
+            )
+        return list(
+            get_user_model().objects.filter(
+                email__startswith=email_prefix
+            ).order_by("id").values_list("id", flat=True)
+        )
+
+    def seed_catalogue(self):
+        rng, config = self.rng, self.config
+        actors = self._bulk_create(Actor, (
+            Actor(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+            )
+            for _ in range(config.actors)
+        ))
+        genres = self._bulk_create(Genre, (
+            Genre(name=GENRE_NAMES[index % len(GENRE_NAMES)])
+            for index in range(config.genres)
+        ))
+        plays = self._bulk_create(Play, (
+            Play(
+                title=" ".join(rng.sample(TITLE_WORDS, 2)),
+                description=" ".join(rng.choices(TITLE_WORDS, k=12)),
+            )
+            for _ in range(config.plays)
+        ))
+        self._bulk_create(Play.genres.through, (
+            Play.genres.through(play_id=play.id, genre_id=genre.id)
+            for play in plays
+            for genre in rng.sample(genres, min(len(genres), rng.randint(1, 3)))
+        ))
+        self._bulk_create(Play.actors.through, (
+            Play.actors.through(play_id=play.id, actor_id=actor.id)
+            for play in plays
+            for actor in rng.sample(actors, min(len(actors), rng.randint(2, 6)))
+        ))
+        Play.update_search_vector([play.id for play in plays])
+        bump_catalogue_version()
+        self.log(
+            f"Catalogue: {len(actors)} actors, {len(genres)} genres, "
+            f"{len(plays)} plays"
+        )
+        return [play.id for play in plays]
+
+    def seed_schedule(self, play_ids):
+        rng, config = self.rng, self.config
+        halls = self._bulk_create(TheatreHall, (
+            TheatreHall(
+                name=f"Hall {index + 1}",
+                rows=rng.randint(config.min_rows, config.max_rows),
+                seats_in_row=rng.randint(
+                    config.min_seats_in_row, config.max_seats_in_row
+                ),
+            )
+            for index in range(config.halls)
+        ))
+        performances = self._bulk_create(Performance, (
+            Performance(
+                play_id=play_id,
+                theatre_hall=rng.choice(halls),
+                show_time=SEASON_START + timedelta(
+                    days=rng.randint(0, 365), hours=rng.choice((0, 3, 6))
+                ),
+            )
+            for play_id in play_ids
+            for _ in range(config.performances_per_play)
+        ))
+        self.log(f"Schedule: {len(halls)} halls, {len(performances)} performances")
+        return performances
+
+    def _performance_seats(self, performance):
+        """Pick unique sold seats of a performance and its seat bitmap"""
+        theatre_hall = performance.theatre_hall
+        capacity = theatre_hall.capacity
+        sold = self.rng.randint(0, int(capacity * self.config.fill_ratio * 2))
+        indexes = sorted(self.rng.sample(range(capacity), min(sold, capacity)))
+        seat_map = bytearray((capacity + 7) // 8)
+        for index in indexes:
+            seat_map[index // 8] |= 1 << (index % 8)
+        seats = [
+            (index // theatre_hall.seats_in_row + 1,
+             index % theatre_hall.seats_in_row + 1)
+            for index in indexes
+        ]
+        return seats, bytes(seat_map)
+
+    def iter_sold_seats(self, performances):
+        """
+        Yield (performance, seats) and keep the denormalized seat map
+        and counter of each performance in step with the generated seats
+        """
+        for performance in performances:
+            seats, seat_map = self._performance_seats(performance)
+            performance.seat_map = seat_map
+            performance.tickets_sold = len(seats)
+            yield performance, seats
+
+    def insert_tickets(self, rows):
+        """Insert (row, seat, performance_id, reservation_id) tuples"""
+        Ticket.objects.bulk_create(
+            Ticket(
+                row=row,
+                seat=seat,
+                performance_id=performance_id,
+                reservation_id=reservation_id,
+            )
+            for row, seat, performance_id, reservation_id in rows
+        )
+
+    def create_reservations(self, user_ids):
+        """Insert one reservation per given user id and return their ids"""
+        reservations = Reservation.objects.bulk_create(
+            [Reservation(user_id=user_id) for user_id in user_ids],
+            batch_size=self.config.batch_size,
+        )
+        return [reservation.id for reservation in reservations]
+
+    def _performances_per_batch(self):
+        config = self.config
+        average_capacity = (
+            (config.min_rows + config.max_rows)
+            * (config.min_seats_in_row + config.max_seats_in_row) / 4
+        )
+        tickets_per_performance = max(1, average_capacity * config.fill_ratio)
+        return max(1, int(config.batch_size // tickets_per_performance))
+
+    def seed_tickets(self, performances, user_ids):
+        """Sell tickets performance batch by performance batch"""
+        rng, config = self.rng, self.config
+        total = 0
+        logged = 0
+        for batch in batched(performances, self._performances_per_batch()):
+            with transaction.atomic():
+                sold = list(self.iter_sold_seats(batch))
+                groups = [
+                    (performance.id, seats[start:start + config.tickets_per_reservation])
+                    for performance, seats in sold
+                    for start in range(0, len(seats), config.tickets_per_reservation)
+                ]
+                reservation_ids = self.create_reservations(
+                    [rng.choice(user_ids) for _ in groups]
+                )
+                rows = [
+                    (row, seat, performance_id, reservation_id)
+                    for reservation_id, (performance_id, seats)
+                    in zip(reservation_ids, groups)
+                    for row, seat in seats
+                ]
+                for rows_batch in batched(rows, config.batch_size):
+                    self.insert_tickets(rows_batch)
+                Performance.objects.bulk_update(
+                    [performance for performance, _ in sold],
+                    ["seat_map", "tickets_sold"],
+                )
+            total += len(rows)
+            if total - logged >= config.batch_size * 20:
+                logged = total
+                self.log(f"Tickets: {total}")
+        self.log(f"Tickets: {total}")
+        return total
+
+    def run(self):
+        user_ids = self.seed_users()
+        play_ids = self.seed_catalogue()
+        performances = self.seed_schedule(play_ids)
+        tickets = self.seed_tickets(performances, user_ids)
+        return {
+            "users": len(user_ids),
+            "plays": len(play_ids),
+            "performances": len(performances),
+            "tickets": tickets,
+        }
+
+
+class CopyTheatreSeeder(TheatreSeeder):
+    """
+    Postgres fast path: reservations and tickets are streamed with COPY,
+    reservation ids are reserved from their sequence up front
+    """
+
+    @staticmethod
+    def _copy(model, columns, rows):
+        quote_name = connection.ops.quote_name
+        statement = (
+            f"COPY {quote_name(model._meta.db_table)} "
+            f"({', '.join(quote_name(column) for column in columns)}) "
+            f"FROM STDIN"
+        )
+        with connection.cursor() as cursor:
+            with cursor.copy(statement) as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+    def create_reservations(self, user_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+                "FROM generate_series(1, %s)",
+                [Reservation._meta.db_table, len(user_ids)],
+            )
+            reservation_ids = [row[0] for row in cursor.fetchall()]
+        created_at = timezone.now()
+        self._copy(
+            Reservation,
+            ("id", "created_at", "user_id"),
+            (
+                (reservation_id, created_at, user_id)
+                for reservation_id, user_id in zip(reservation_ids, user_ids)
+            ),
+        )
+        return reservation_ids
+
+    def insert_tickets(self, rows):
+        self._copy(
+            Ticket, ("row", "seat", "performance_id", "reservation_id"), rows
+        )
+
+    def run(self):
+        # Generated data can be regenerated, so skip waiting on WAL flushes
+        with connection.cursor() as cursor:
+            cursor.execute("SET synchronous_commit = off")
+        try:
+            return super().run()
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("RESET synchronous_commit")
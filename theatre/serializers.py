@@ -1,7 +1,20 @@
-from django.db import transaction
+import base64
+from bisect import bisect_right
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from theatre.images import rendition_urls
+from theatre.metrics import (
+    RESERVATION_CONFLICTS,
+    RESERVATIONS_CREATED,
+    TICKETS_SOLD,
+)
 from theatre.models import (
     Play,
     Actor,
@@ -9,10 +22,19 @@ from theatre.models import (
     TheatreHall,
     Performance,
     Reservation,
-    Ticket
+    Ticket,
+    SeatHold,
 )
 
 
+def seats_filter(seats) -> Q:
+    """Build one OR-ed filter for a set of (performance_id, row, seat)"""
+    query = Q()
+    for performance_id, row, seat in seats:
+        query |= Q(performance_id=performance_id, row=row, seat=seat)
+    return query
+
+
 class ActorSerializer(serializers.ModelSerializer):
     class Meta:
         model = Actor
@@ -32,31 +54,50 @@ class PlaySerializer(serializers.ModelSerializer):
         fields = ("id", "title", "description")
 
 
+class ImageRenditionsMixin(serializers.Serializer):
+    image_renditions = serializers.SerializerMethodField()
+
+    def get_image_renditions(self, obj) -> dict:
+        return rendition_urls(obj, self.context.get("request"))
+
+
 class PlayListSerializer(PlaySerializer):
     genres = serializers.SlugRelatedField(
         many=True, read_only=True, slug_field="name"
     )
     actors = serializers.SlugRelatedField(
-        many=True, read_only=True, slug_field="name"
+        many=True, read_only=True, slug_field="full_name"
     )
+    thumbnail = serializers.SerializerMethodField()
 
     class Meta(PlaySerializer.Meta):
-        fields = ("id", "title", "description", "genres", "actors", "image")
+        fields = (
+            "id", "title", "description", "genres", "actors", "image",
+            "thumbnail",
+        )
+
+    def get_thumbnail(self, obj) -> str | None:
+        return rendition_urls(obj, self.context.get("request")).get(
+            "thumbnail"
+        )
 
 
-class PlayDetailSerializer(PlaySerializer):
+class PlayDetailSerializer(ImageRenditionsMixin, PlaySerializer):
     genres = GenreSerializer(many=True, read_only=True)
     actors = ActorSerializer(many=True, read_only=True)
 
     class Meta(PlaySerializer.Meta):
-        fields = ("id", "title", "description", "genres", "actors", "image")
+        fields = (
+            "id", "title", "description", "genres", "actors", "image",
+            "image_renditions",
+        )
 
 
-class PlayImageSerializer(serializers.ModelSerializer):
+class PlayImageSerializer(ImageRenditionsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Play
-        fields = ("id", "image")
+        fields = ("id", "image", "image_renditions")
         read_only_fields = ("id",)
 
 
@@ -73,6 +114,146 @@ class PerformanceSerializer(serializers.ModelSerializer):
         fields = ("id", "show_time", "play", "theatre_hall")
 
 
+class RecurrenceSerializer(serializers.Serializer):
+    start = serializers.DateTimeField()
+    until = serializers.DateField()
+    weekdays = serializers.ListField(
+        child=serializers.IntegerField(min_value=0, max_value=6),
+        required=False,
+        allow_empty=False,
+        help_text="Days of week to schedule on, Monday is 0 (default: all)",
+    )
+
+    def validate(self, attrs):
+        if attrs["until"] < timezone.localdate(attrs["start"]):
+            raise ValidationError({"until": "Must not be before start"})
+        return attrs
+
+    @staticmethod
+    def show_times(recurrence):
+        """Every matching day from start until (inclusive), at start time"""
+        start = recurrence["start"]
+        weekdays = set(recurrence.get("weekdays", range(7)))
+        days = (recurrence["until"] - timezone.localdate(start)).days + 1
+        return [
+            start + timedelta(days=day)
+            for day in range(days)
+            if (start + timedelta(days=day)).weekday() in weekdays
+        ]
+
+
+class PerformanceBulkScheduleSerializer(serializers.Serializer):
+    max_performances = 1000
+
+    play = serializers.PrimaryKeyRelatedField(queryset=Play.objects.all())
+    theatre_hall = serializers.PrimaryKeyRelatedField(
+        queryset=TheatreHall.objects.all()
+    )
+    show_times = serializers.ListField(
+        child=serializers.DateTimeField(), required=False, allow_empty=False
+    )
+    recurrence = RecurrenceSerializer(required=False)
+    skip_conflicts = serializers.BooleanField(
+        default=False,
+        help_text="Create the performances without conflicts "
+                  "instead of rejecting the whole batch",
+    )
+
+    def validate(self, attrs):
+        if ("show_times" in attrs) == ("recurrence" in attrs):
+            raise ValidationError(
+                "Provide either show_times or recurrence"
+            )
+        if "recurrence" in attrs:
+            attrs["show_times"] = RecurrenceSerializer.show_times(
+                attrs.pop("recurrence")
+            )
+        if not attrs["show_times"]:
+            raise ValidationError("The recurrence has no show times")
+        if len(attrs["show_times"]) > self.max_performances:
+            raise ValidationError(
+                f"At most {self.max_performances} performances "
+                f"can be scheduled at once"
+            )
+        return attrs
+
+    @staticmethod
+    def find_conflicts(theatre_hall, show_times):
+        """
+        Map the index of every show time that overlaps a performance
+        of the hall, existing or earlier in the batch, to an error.
+        Existing performances are fetched with one range query.
+        """
+        duration = settings.PERFORMANCE_DURATION
+        ordered = sorted(enumerate(show_times), key=lambda item: item[1])
+        existing = list(
+            Performance.objects.filter(
+                theatre_hall=theatre_hall,
+                show_time__gt=ordered[0][1] - duration,
+                show_time__lt=ordered[-1][1] + duration,
+            ).order_by("show_time").values_list("show_time", flat=True)
+        )
+        conflicts = {}
+        previous = None
+        for index, show_time in ordered:
+            position = bisect_right(existing, show_time - duration)
+            if (
+                position < len(existing)
+                and existing[position] < show_time + duration
+            ):
+                conflicts[index] = (
+                    f"Overlaps the performance at "
+                    f"{existing[position].isoformat()} in this hall"
+                )
+            elif previous is not None and show_time - previous < duration:
+                conflicts[index] = (
+                    f"Overlaps the performance at {previous.isoformat()} "
+                    f"in this batch"
+                )
+            else:
+                previous = show_time
+        return conflicts
+
+    def create(self, validated_data):
+        play = validated_data["play"]
+        show_times = validated_data["show_times"]
+        with transaction.atomic():
+            # Concurrent schedules of one hall are checked one at a time
+            theatre_hall = TheatreHall.objects.select_for_update().get(
+                pk=validated_data["theatre_hall"].pk
+            )
+            conflicts = self.find_conflicts(theatre_hall, show_times)
+            errors = [
+                {
+                    "index": index,
+                    "show_time": show_times[index],
+                    "error": error,
+                }
+                for index, error in sorted(conflicts.items())
+            ]
+            if errors and not validated_data["skip_conflicts"]:
+                return {"created": [], "errors": errors}
+            performances = Performance.objects.bulk_create(
+                Performance(
+                    play=play, theatre_hall=theatre_hall, show_time=show_time
+                )
+                for index, show_time in enumerate(show_times)
+                if index not in conflicts
+            )
+        return {"created": performances, "errors": errors}
+
+    def to_representation(self, instance):
+        return {
+            "created": PerformanceSerializer(
+                instance["created"], many=True
+            ).data,
+            "errors": [
+                {**error, "show_time": error["show_time"].isoformat()}
+                for error in instance["errors"]
+            ],
+        }
+
+
 class PerformanceListSerializer(PerformanceSerializer):
     play_title = serializers.CharField(
         source="play.title", read_only=True
@@ -96,24 +277,20 @@ class PerformanceListSerializer(PerformanceSerializer):
         )
 
     def get_tickets_available(self, obj):
-        total_capacity = obj.theatre_hall.capacity
-        taken_tickets = obj.tickets.count()
-        return total_capacity - taken_tickets
+        if hasattr(obj, "tickets_available"):
+            return obj.tickets_available
+        return obj.theatre_hall.capacity - obj.tickets_sold
 
 
 class TicketSerializer(serializers.ModelSerializer):
-    def validate(self, attrs):
-        data = super(TicketSerializer, self).validate(attrs)
-        Ticket.validate_ticket(
-            attrs["row"], attrs["seat"], attrs["performance"]
-            .theatre_hall,
-            ValidationError
-        )
-        return data
+    # A plain id, ReservationSerializer loads the performances at once
+    performance = serializers.IntegerField(source="performance_id")
 
     class Meta:
         model = Ticket
         fields = ("id", "row", "seat", "performance")
+        # Seat uniqueness is checked against the performance seat map
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
@@ -141,6 +318,27 @@ class PerformanceDetailSerializer(PerformanceSerializer):
         )
 
 
+class PerformanceSeatMapSerializer(serializers.ModelSerializer):
+    rows = serializers.IntegerField(
+        source="theatre_hall.rows", read_only=True
+    )
+    seats_in_row = serializers.IntegerField(
+        source="theatre_hall.seats_in_row", read_only=True
+    )
+    seat_map = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Performance
+        fields = ("id", "rows", "seats_in_row", "seat_map")
+
+    def get_seat_map(self, obj):
+        """
+        Base64 of the occupancy bitmap: bit (row - 1) * seats_in_row
+        + (seat - 1), least significant bit first, is set for a taken seat
+        """
+        return base64.b64encode(bytes(obj.seat_map)).decode()
+
+
 class ReservationSerializer(serializers.ModelSerializer):
     tickets = TicketSerializer(
         many=True, read_only=False, allow_empty=False
@@ -150,14 +348,162 @@ class ReservationSerializer(serializers.ModelSerializer):
         model = Reservation
         fields = ("id", "tickets", "created_at")
 
+    def validate(self, attrs):
+        """
+        Validate all requested seats against their performances, loaded
+        with one query: each seat must fit the hall, be free in the seat
+        map and be requested only once
+        """
+        data = super(ReservationSerializer, self).validate(attrs)
+        performances = Performance.objects.select_related(
+            "theatre_hall"
+        ).in_bulk({
+            ticket_data["performance_id"] for ticket_data in attrs["tickets"]
+        })
+        seats = set()
+        for ticket_data in attrs["tickets"]:
+            performance_id = ticket_data["performance_id"]
+            row, seat = ticket_data["row"], ticket_data["seat"]
+            performance = performances.get(performance_id)
+            if performance is None:
+                raise ValidationError(
+                    {"performance": f'Invalid pk "{performance_id}" '
+                                    f"- object does not exist."}
+                )
+            Ticket.validate_ticket(
+                row, seat, performance.theatre_hall, ValidationError
+            )
+            if (
+                performance.is_seat_taken(row, seat)
+                or (performance_id, row, seat) in seats
+            ):
+                RESERVATION_CONFLICTS.inc(reason="taken")
+                raise ValidationError(
+                    f"Seat (row: {row}, seat: {seat}) is already taken"
+                )
+            seats.add((performance_id, row, seat))
+        return data
+
+    @staticmethod
+    def _check_held_seats(seats, user):
+        """Reject seats held by other users with one query"""
+        held = SeatHold.objects.filter(
+            seats_filter(seats), expires_at__gt=timezone.now()
+        )
+        if user is not None:
+            held = held.exclude(user=user)
+        held = held.values_list("row", "seat").first()
+        if held:
+            RESERVATION_CONFLICTS.inc(reason="held")
+            raise ValidationError(
+                f"Seat (row: {held[0]}, seat: {held[1]}) is held "
+                f"by another user"
+            )
+
     def create(self, validated_data):
         with transaction.atomic():
             tickets_data = validated_data.pop("tickets")
+            seats = {
+                (ticket_data["performance_id"], ticket_data["row"],
+                 ticket_data["seat"])
+                for ticket_data in tickets_data
+            }
+            self._check_held_seats(seats, validated_data.get("user"))
             reservation = Reservation.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                Ticket.objects.create(reservation=reservation, **ticket_data)
-            return reservation
+            try:
+                with transaction.atomic():
+                    Ticket.objects.bulk_create(
+                        Ticket(reservation=reservation, **ticket_data)
+                        for ticket_data in tickets_data
+                    )
+            except IntegrityError:
+                RESERVATION_CONFLICTS.inc(reason="integrity")
+                raise ValidationError("Some of the seats are already taken")
+            # Checked out holds are converted, expired ones are dropped
+            SeatHold.objects.filter(seats_filter(seats)).delete()
+            performances_seats = {}
+            for performance_id, row, seat in seats:
+                performances_seats.setdefault(performance_id, []).append(
+                    (row, seat)
+                )
+            for performance_id, performance_seats in sorted(
+                performances_seats.items()
+            ):
+                Performance.update_seat_map(performance_id, performance_seats)
+        RESERVATIONS_CREATED.inc()
+        TICKETS_SOLD.inc(len(seats))
+        return reservation
 
 
 class ReservationListSerializer(ReservationSerializer):
-    tickets = TicketSerializer(many=True, read_only=True,)
+    tickets = TicketListSerializer(many=True, read_only=True,)
+
+
+class SeatSerializer(serializers.Serializer):
+    row = serializers.IntegerField(min_value=1)
+    seat = serializers.IntegerField(min_value=1)
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("id", "performance", "row", "seat", "expires_at")
+        read_only_fields = fields
+
+
+class SeatHoldCreateSerializer(serializers.Serializer):
+    performance = serializers.PrimaryKeyRelatedField(
+        queryset=Performance.objects.select_related("theatre_hall")
+    )
+    seats = SeatSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        performance = attrs["performance"]
+        seats = set()
+        for seat_data in attrs["seats"]:
+            row, seat = seat_data["row"], seat_data["seat"]
+            Ticket.validate_ticket(
+                row, seat, performance.theatre_hall, ValidationError
+            )
+            if performance.is_seat_taken(row, seat):
+                raise ValidationError(
+                    f"Seat (row: {row}, seat: {seat}) is already taken"
+                )
+            seats.add((performance.id, row, seat))
+        attrs["seats"] = seats
+        return attrs
+
+    def create(self, validated_data):
+        performance = validated_data["performance"]
+        seats = validated_data["seats"]
+        user = validated_data["user"]
+        now = timezone.now()
+        with transaction.atomic():
+            SeatHold.objects.filter(
+                performance=performance, expires_at__lte=now
+            ).delete()
+            held = SeatHold.objects.filter(seats_filter(seats))
+            held_by_others = held.exclude(user=user).values_list(
+                "row", "seat"
+            ).first()
+            if held_by_others:
+                raise ValidationError(
+                    f"Seat (row: {held_by_others[0]}, "
+                    f"seat: {held_by_others[1]}) is held by another user"
+                )
+            # Holding a seat again extends the hold
+            held.delete()
+            try:
+                with transaction.atomic():
+                    return SeatHold.objects.bulk_create(
+                        SeatHold(
+                            performance=performance,
+                            row=row,
+                            seat=seat,
+                            user=user,
+                            expires_at=now + settings.SEAT_HOLD_TTL,
+                        )
+                        for _, row, seat in sorted(seats)
+                    )
+            except IntegrityError:
+                raise ValidationError("Some of the seats are already held")
@@ -0,0 +1,171 @@
+"""
+Media and static file serving with conditional and byte-range
+requests. Files go out as FileResponse, so gunicorn hands them to
+sendfile() instead of copying them through the worker. Hashed names
+never change their bytes and are cached by clients for a year.
+"""
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Content-addressed media (theatre.storage) and manifest static names
+HASHED_MEDIA_RE = re.compile(r"(^|/)[0-9a-f]{2}/(?P<hash>[0-9a-f]{64})\.[^/]*$")
+HASHED_STATIC_RE = re.compile(r"\.[0-9a-f]{12}\.[^/.]+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+class FileRange:
+    """
+    A byte range of an open file. Reads stop at the end of the range,
+    while fileno() lets gunicorn sendfile() it from the current offset
+    for Content-Length bytes.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """(start, length) of a single byte range, None to send everything"""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, end - start + 1
+
+
+def serve_file(request, full_path, immutable=False, etag=None):
+    try:
+        file_stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("File not found")
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404("File not found")
+
+    size = file_stat.st_size
+    etag = etag or f'"{file_stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = http_date(file_stat.st_mtime)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        ),
+        "Accept-Ranges": "bytes",
+    }
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=int(file_stat.st_mtime)
+    )
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified.headers.setdefault(header, value)
+        return not_modified
+
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if range_header and if_range_matches(request, etag, file_stat.st_mtime):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    file = open(full_path, "rb")
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, length = byte_range
+        response = FileResponse(
+            FileRange(file, start, length),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Length"] = length
+        response["Content-Range"] = (
+            f"bytes {start}-{start + length - 1}/{size}"
+        )
+    if encoding:
+        response["Content-Encoding"] = encoding
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def if_range_matches(request, etag, mtime):
+    """A Range only applies while If-Range still names this version"""
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def _resolve(root, path):
+    try:
+        return safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+
+
+@require_safe
+def serve_media(request, path):
+    match = HASHED_MEDIA_RE.search(path)
+    return serve_file(
+        request,
+        _resolve(settings.MEDIA_ROOT, path),
+        immutable=match is not None,
+        etag=f'"{match["hash"]}"' if match else None,
+    )
+
+
+@require_safe
+def serve_static(request, path):
+    full_path = _resolve(settings.STATIC_ROOT, path)
+    if settings.DEBUG and not os.path.exists(full_path):
+        # Not collected yet, look in the app static directories
+        full_path = finders.find(path) or full_path
+    return serve_file(
+        request, full_path, immutable=bool(HASHED_STATIC_RE.search(path))
+    )
@@ -0,0 +1,130 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from theatre.cache import bump_catalogue_version
+from theatre.models import (
+    Actor,
+    Genre,
+    Performance,
+    Play,
+    TheatreHall,
+    Ticket,
+)
+
+
+def _refresh_cached_performance(ticket):
+    """Keep an already loaded ticket performance in sync with the DB"""
+    if Ticket.performance.is_cached(ticket):
+        ticket.performance.refresh_from_db(
+            fields=["seat_map", "tickets_sold"]
+        )
+
+
+@receiver(post_save, sender=Ticket)
+def occupy_ticket_seat(sender, instance, created, **kwargs):
+    if created:
+        Performance.update_seat_map(
+            instance.performance_id, [(instance.row, instance.seat)]
+        )
+        _refresh_cached_performance(instance)
+    else:
+        instance.performance.rebuild_seat_map()
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs):
+    Performance.update_seat_map(
+        instance.performance_id, [(instance.row, instance.seat)], taken=False
+    )
+
+
+@receiver(pre_save, sender=TheatreHall)
+def remember_hall_dimensions(sender, instance, **kwargs):
+    instance._previous_dimensions = (
+        TheatreHall.objects.filter(pk=instance.pk)
+        .values_list("rows", "seats_in_row")
+        .first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=TheatreHall)
+def rebuild_hall_seat_maps(sender, instance, **kwargs):
+    """Seat bits are indexed by seats_in_row, rebuild them on a resize"""
+    previous = getattr(instance, "_previous_dimensions", None)
+    if previous in (None, (instance.rows, instance.seats_in_row)):
+        return
+    for performance in instance.performances.only("pk"):
+        performance.rebuild_seat_map()
+
+
+@receiver(post_save, sender=Play)
+@receiver(post_delete, sender=Play)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Actor)
+@receiver(post_delete, sender=Actor)
+@receiver(post_save, sender=TheatreHall)
+@receiver(post_delete, sender=TheatreHall)
+def invalidate_catalogue(sender, **kwargs):
+    bump_catalogue_version()
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def invalidate_catalogue_relations(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_catalogue_version()
+
+
+def _related_play_ids(instance):
+    if isinstance(instance, Genre):
+        plays = Play.objects.filter(genres=instance)
+    else:
+        plays = Play.objects.filter(actors=instance)
+    return list(plays.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Play)
+def update_play_search_vector(sender, instance, **kwargs):
+    Play.update_search_vector([instance.pk])
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Actor)
+def update_related_plays_search_vector(sender, instance, **kwargs):
+    Play.update_search_vector(_related_play_ids(instance))
+
+
+@receiver(pre_delete, sender=Genre)
+@receiver(pre_delete, sender=Actor)
+def collect_related_plays(sender, instance, **kwargs):
+    instance._related_play_ids = _related_play_ids(instance)
+
+
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Actor)
+def update_unlinked_plays_search_vector(sender, instance, **kwargs):
+    Play.update_search_vector(getattr(instance, "_related_play_ids", []))
+
+
+@receiver(m2m_changed, sender=Play.genres.through)
+@receiver(m2m_changed, sender=Play.actors.through)
+def update_play_relations_search_vector(
+        sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            Play.update_search_vector([instance.pk])
+    elif action == "pre_clear":
+        instance._related_play_ids = _related_play_ids(instance)
+    elif action == "post_clear":
+        Play.update_search_vector(getattr(instance, "_related_play_ids", []))
+    elif action in ("post_add", "post_remove"):
+        Play.update_search_vector(pk_set)
@@ -0,0 +1,54 @@
+"""
+Content-addressed media storage: a file is stored under the SHA-256
+of its bytes, so identical uploads are kept once and a URL always
+points at the same bytes and can be cached forever.
+"""
+import hashlib
+import os
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(content):
+    """SHA-256 hex digest of a file, read chunk by chunk"""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Keeps the directory and extension of the requested name and replaces
+    the file name with `<first two hash chars>/<hash>`. Saving bytes
+    that are already stored returns the existing name without writing.
+    """
+
+    def hashed_name(self, name, content):
+        directory, filename = os.path.split(name)
+        _, extension = os.path.splitext(filename)
+        digest = content_hash(content)
+        return os.path.join(
+            directory, digest[:2], f"{digest}{extension.lower()}"
+        )
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from the content in _save, never renamed
+        return name
+
+    def _save(self, name, content):
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Refresh the age so collect_media_garbage spares a file
+            # that just gained a new reference
+            os.utime(self.path(name))
+            return name
+        # Readers must never see a partly written file under its hash
+        temporary = super()._save(f"{name}.{uuid.uuid4().hex}.tmp", content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
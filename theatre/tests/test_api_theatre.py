@@ -1,16 +1,30 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
 from django.urls import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from rest_framework.test import APIClient
 from rest_framework import status
+from rest_framework.throttling import SimpleRateThrottle
+from unittest import mock
+import base64
+import json
 import tempfile
 import os
 from PIL import Image
 from datetime import datetime, timezone
 
-from theatre.models import Play, TheatreHall, Performance, Ticket, Reservation
+from theatre.instrumentation import request_metrics
+from theatre.views import PlayViewSet
+from theatre.models import (
+    Actor, Genre, Play, TheatreHall, Performance, Ticket, Reservation, SeatHold
+)
 
+# Query count assertions cover the views, not the throttle buckets
+THROTTLING_OFF = {scope: None for scope in SimpleRateThrottle.THROTTLE_RATES}
 
+
+@mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, THROTTLING_OFF)
 class PlayAPITestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -19,11 +33,14 @@ class PlayAPITestCase(TestCase):
         )
         self.client.force_authenticate(user=self.user)
         self.play = Play.objects.create(title="Hamlet", description="Tragedy")
+        cache.clear()
 
     def test_get_play_list(self):
         response = self.client.get("/api/theatre/plays/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("Hamlet", [item["title"] for item in response.json()])
+        self.assertIn(
+            "Hamlet", [item["title"] for item in response.json()["results"]]
+        )
 
     def test_create_play(self):
         data = {"title": "Othello", "description": "Tragedy by Shakespeare"}
@@ -31,7 +48,71 @@ class PlayAPITestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(Play.objects.filter(title="Othello").exists())
 
+    def test_play_list_cached_until_catalogue_changes(self):
+        self.client.get("/api/theatre/plays/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/theatre/plays/")
+        self.assertEqual(len(response.json()["results"]), 1)
+
+        genre = Genre.objects.create(name="Drama")
+        self.play.genres.add(genre)
+        response = self.client.get("/api/theatre/plays/")
+        self.assertEqual(response.json()["results"][0]["genres"], ["Drama"])
+
+    def test_play_list_not_modified(self):
+        response = self.client.get("/api/theatre/plays/")
+        etag = response["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                "/api/theatre/plays/", HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_play_etag_per_url_and_media_type(self):
+        etags = {
+            self.client.get(url, query, HTTP_ACCEPT=accept)["ETag"]
+            for url, query, accept in [
+                ("/api/theatre/plays/", {}, "application/json"),
+                ("/api/theatre/plays/", {"title": "ham"}, "application/json"),
+                ("/api/theatre/plays/", {}, "text/html"),
+                (f"/api/theatre/plays/{self.play.id}/", {}, "application/json"),
+            ]
+        }
+        self.assertEqual(len(etags), 4)
+
+    def test_play_full_text_search(self):
+        othello = Play.objects.create(
+            title="Othello", description="The Moor of Venice"
+        )
+        actor = Actor.objects.create(first_name="Laurence", last_name="Olivier")
+        othello.actors.add(actor)
+        Play.objects.create(title="Venice", description="A comedy")
+
+        response = self.client.get("/api/theatre/plays/", {"q": "olivier"})
+        self.assertEqual(
+            [item["title"] for item in response.json()["results"]], ["Othello"]
+        )
+        response = self.client.get("/api/theatre/plays/", {"q": "venice"})
+        self.assertEqual(
+            [item["title"] for item in response.json()["results"]],
+            ["Venice", "Othello"],
+        )
+
+        actor.last_name = "Fishburne"
+        actor.save()
+        response = self.client.get("/api/theatre/plays/", {"q": "olivier"})
+        self.assertEqual(response.json()["results"], [])
+
+    def test_play_detail_invalidated_on_save(self):
+        url = f"/api/theatre/plays/{self.play.id}/"
+        self.client.get(url)
+        self.play.title = "Macbeth"
+        self.play.save()
+        response = self.client.get(url)
+        self.assertEqual(response.json()["title"], "Macbeth")
 
+
+@mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, THROTTLING_OFF)
 class ReservationAPITestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -62,7 +143,31 @@ class ReservationAPITestCase(TestCase):
         response = self.client.post("/api/theatre/reservations/", payload, format="json")
         self.assertIn(response.status_code, [status.HTTP_201_CREATED, status.HTTP_200_OK])
 
+    def test_reservation_list_constant_queries(self):
+        for seats_in_row, hall_name in ((5, "Hall A"), (6, "Hall B")):
+            performance = Performance.objects.create(
+                play=self.play,
+                theatre_hall=TheatreHall.objects.create(
+                    name=hall_name, rows=1, seats_in_row=seats_in_row
+                ),
+                show_time=datetime(2025, 12, 2, 19, 0, tzinfo=timezone.utc),
+            )
+            reservation = Reservation.objects.create(user=self.user)
+            for seat in range(1, seats_in_row + 1):
+                Ticket.objects.create(
+                    row=1, seat=seat,
+                    performance=performance, reservation=reservation
+                )
+        with self.assertNumQueries(2):
+            response = self.client.get("/api/theatre/reservations/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tickets = response.json()["results"][-1]["tickets"]
+        self.assertEqual(len(tickets), 6)
+        self.assertEqual(tickets[0]["performance"]["play_title"], "Hamlet")
+        self.assertEqual(tickets[0]["performance"]["tickets_available"], 0)
+
 
+@mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, THROTTLING_OFF)
 class PerformanceAPITestCase(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -85,10 +190,154 @@ class PerformanceAPITestCase(TestCase):
     def test_performance_list_tickets_available(self):
         response = self.client.get("/api/theatre/performances/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        performance_data = response.json()[0]
+        performance_data = response.json()["results"][0]
         self.assertEqual(performance_data["theatre_hall_capacity"], 4)
         self.assertEqual(performance_data["tickets_available"], 3)
 
+    def test_performance_list_filter_by_date(self):
+        Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.hall,
+            show_time=datetime(2025, 12, 2, 0, 0, tzinfo=timezone.utc),
+        )
+        response = self.client.get(
+            "/api/theatre/performances/", {"date": "2025-12-01"}
+        )
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]],
+            [self.performance.id],
+        )
+
+    def test_performance_list_constant_queries(self):
+        for hour in range(10):
+            Performance.objects.create(
+                play=self.play,
+                theatre_hall=self.hall,
+                show_time=datetime(2025, 12, 2, hour, 0, tzinfo=timezone.utc),
+            )
+        for page_size in (2, 11):
+            # ETag fingerprint and the page itself
+            with self.assertNumQueries(2):
+                response = self.client.get(
+                    "/api/theatre/performances/", {"page_size": page_size}
+                )
+            self.assertEqual(len(response.json()["results"]), page_size)
+
+    def test_performance_list_cursor_pagination(self):
+        for hour in range(3):
+            Performance.objects.create(
+                play=self.play,
+                theatre_hall=self.hall,
+                show_time=datetime(2025, 11, 30, hour, 0, tzinfo=timezone.utc),
+            )
+        response = self.client.get(
+            "/api/theatre/performances/", {"page_size": 2}
+        )
+        first_page = response.json()
+        self.assertIsNotNone(first_page["next"])
+        response = self.client.get(first_page["next"])
+        second_page = response.json()
+        show_times = [
+            item["show_time"]
+            for item in first_page["results"] + second_page["results"]
+        ]
+        self.assertEqual(show_times, sorted(show_times))
+        self.assertEqual(len(show_times), 4)
+        self.assertIsNone(second_page["next"])
+
+    def test_performance_list_invalid_filters(self):
+        for params in ({"date": "19-09-2025"}, {"play": "x"}):
+            response = self.client.get("/api/theatre/performances/", params)
+            self.assertEqual(
+                response.status_code, status.HTTP_400_BAD_REQUEST
+            )
+            self.assertIn(next(iter(params)), response.json())
+
+    def test_performance_list_not_modified(self):
+        response = self.client.get("/api/theatre/performances/")
+        etag = response["ETag"]
+        self.assertNotIn("Last-Modified", response)
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/api/theatre/performances/", HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Ticket.objects.create(
+            row=1, seat=2, performance=self.performance, reservation=self.reservation
+        )
+        response = self.client.get(
+            "/api/theatre/performances/", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_performance_seat_map(self):
+        Ticket.objects.create(
+            row=2, seat=2, performance=self.performance, reservation=self.reservation
+        )
+        response = self.client.get(
+            f"/api/theatre/performances/{self.performance.id}/seat-map/"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["rows"], 2)
+        self.assertEqual(response.json()["seats_in_row"], 2)
+        seat_map = base64.b64decode(response.json()["seat_map"])
+        self.assertEqual(seat_map, bytes([0b1001]))
+
+    def test_seat_map_released_on_reservation_delete(self):
+        self.reservation.delete()
+        self.performance.refresh_from_db()
+        self.assertFalse(self.performance.is_seat_taken(1, 1))
+
+    def test_bulk_schedule_recurrence(self):
+        response = self.client.post(
+            "/api/theatre/performances/bulk/",
+            {
+                "play": self.play.id,
+                "theatre_hall": self.hall.id,
+                "recurrence": {
+                    "start": "2025-12-02T19:00:00Z",
+                    "until": "2025-12-14",
+                    "weekdays": [5, 6],
+                },
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.json()["created"]), 4)
+        self.assertEqual(
+            Performance.objects.filter(show_time__week_day__in=[1, 7]).count(),
+            4,
+        )
+
+    def test_bulk_schedule_rejects_overlaps(self):
+        payload = {
+            "play": self.play.id,
+            "theatre_hall": self.hall.id,
+            "show_times": [
+                "2025-12-01T20:00:00Z",
+                "2025-12-03T19:00:00Z",
+                "2025-12-03T21:00:00Z",
+            ],
+        }
+        response = self.client.post(
+            "/api/theatre/performances/bulk/", payload, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            [error["index"] for error in response.json()["errors"]], [0, 2]
+        )
+        self.assertEqual(Performance.objects.count(), 1)
+
+        payload["skip_conflicts"] = True
+        response = self.client.post(
+            "/api/theatre/performances/bulk/", payload, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.json()["created"]), 1)
+        self.assertEqual(Performance.objects.count(), 2)
+
 
 class PlayImageUploadTests(TestCase):
     def setUp(self):
@@ -99,11 +348,11 @@ class PlayImageUploadTests(TestCase):
         self.client.force_authenticate(user=self.user)
         self.play = Play.objects.create(title="Hamlet", description="Tragedy")
         self.url = reverse("theatre:play-upload-image", args=[self.play.id])
-
-    def tearDown(self):
-        if self.play.image:
-            if os.path.exists(self.play.image.path):
-                os.remove(self.play.image.path)
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
 
     def test_upload_image_to_play(self):
         with tempfile.NamedTemporaryFile(suffix=".jpg") as temp_image:
@@ -117,3 +366,242 @@ class PlayImageUploadTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn("image", res.data)
         self.assertTrue(os.path.exists(self.play.image.path))
+
+    def test_upload_image_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        res = self.client.post(self.url, {}, format="multipart")
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=None)
+        res = self.client.post(self.url, {}, format="multipart")
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(IMAGE_WORKERS=0)
+    def test_upload_image_renders_renditions(self):
+        with tempfile.NamedTemporaryFile(suffix=".png") as temp_image:
+            Image.new("RGB", (1200, 800)).save(temp_image, format="PNG")
+            temp_image.seek(0)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    self.url, {"image": temp_image}, format="multipart"
+                )
+
+        self.play.refresh_from_db()
+        self.assertEqual(
+            set(self.play.image_renditions), {"thumbnail", "card", "hero"}
+        )
+        with default_storage.open(
+            self.play.image_renditions["thumbnail"]
+        ) as file, Image.open(file) as thumbnail:
+            self.assertEqual(thumbnail.format, "WEBP")
+            self.assertEqual(thumbnail.size, (200, 200))
+
+        response = self.client.get("/api/theatre/plays/")
+        self.assertTrue(
+            response.json()["results"][0]["thumbnail"].endswith(
+                self.play.image_renditions["thumbnail"]
+            )
+        )
+
+
+class SeatHoldAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="pass1234"
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="pass1234"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.play = Play.objects.create(title="Hamlet", description="Tragedy")
+        self.hall = TheatreHall.objects.create(name="Small Hall", rows=2, seats_in_row=2)
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.hall,
+            show_time=datetime(2025, 12, 1, 19, 0, tzinfo=timezone.utc),
+        )
+        self.url = "/api/theatre/seat_holds/"
+
+    def hold(self, *seats):
+        return self.client.post(
+            self.url,
+            {
+                "performance": self.performance.id,
+                "seats": [{"row": row, "seat": seat} for row, seat in seats],
+            },
+            format="json",
+        )
+
+    def test_hold_seats(self):
+        response = self.hold((1, 1), (1, 2))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.json()), 2)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_seat_held_by_other_user(self):
+        self.hold((1, 1))
+        self.client.force_authenticate(user=self.other_user)
+        response = self.hold((1, 1))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            "/api/theatre/reservations/",
+            {"tickets": [{"row": 1, "seat": 1, "performance": self.performance.id}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_expired_hold_is_released(self):
+        self.hold((1, 1))
+        SeatHold.objects.update(expires_at=datetime(2020, 1, 1, tzinfo=timezone.utc))
+        self.client.force_authenticate(user=self.other_user)
+        response = self.hold((1, 1))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_checkout_converts_holds(self):
+        self.hold((2, 1))
+        response = self.client.post(
+            "/api/theatre/reservations/",
+            {"tickets": [{"row": 2, "seat": 1, "performance": self.performance.id}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertTrue(
+            Ticket.objects.filter(performance=self.performance, row=2, seat=1).exists()
+        )
+
+
+class RequestMetricsAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="pass1234", is_staff=False
+        )
+        self.client.force_authenticate(user=self.user)
+        request_metrics.reset()
+
+    def test_server_timing_header(self):
+        response = self.client.get("/api/theatre/performances/")
+        self.assertIn('queries"', response["Server-Timing"])
+        self.assertIn("serialize;dur=", response["Server-Timing"])
+        self.assertIn("render;dur=", response["Server-Timing"])
+        self.assertIn("total;dur=", response["Server-Timing"])
+
+    def test_metrics_admin_only(self):
+        response = self.client.get("/api/theatre/metrics/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_metrics_histograms(self):
+        self.client.get("/api/theatre/performances/")
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get("/api/theatre/metrics/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = response.json()["GET theatre:performance-list"]
+        self.assertEqual(metrics["count"], 1)
+        self.assertEqual(sum(metrics["latency_ms"]["buckets"].values()), 1)
+
+    @mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, {"user": "1/min"})
+    def test_metrics_polls_are_not_throttled(self):
+        self.user.is_staff = True
+        self.user.save()
+        for _ in range(3):
+            response = self.client.get("/api/theatre/metrics/")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_n_plus_one_logged(self):
+        genre = Genre.objects.create(name="Drama")
+        for number in range(12):
+            Play.objects.create(
+                title=f"Play {number}", description="Drama"
+            ).genres.add(genre)
+        cache.clear()
+
+        with self.assertNoLogs("theatre.instrumentation", "WARNING"):
+            self.client.get("/api/theatre/plays/")
+
+        cache.clear()
+        # Without the prefetch every play loads its genres and actors
+        with mock.patch.object(PlayViewSet, "queryset", Play.objects.all()):
+            with self.assertLogs(
+                "theatre.instrumentation", "WARNING"
+            ) as logs:
+                self.client.get("/api/theatre/plays/")
+        self.assertIn("PlayListSerializer", logs.output[0])
+        self.assertIn("repeated 12 times", logs.output[0])
+
+
+class SalesExportAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@example.com", password="pass1234"
+        )
+        self.client.force_authenticate(user=self.user)
+        play = Play.objects.create(title="Hamlet", description="Tragedy")
+        hall = TheatreHall.objects.create(name="Small Hall", rows=2, seats_in_row=2)
+        self.performances = [
+            Performance.objects.create(
+                play=play,
+                theatre_hall=hall,
+                show_time=datetime(2025, 12, day, 19, 0, tzinfo=timezone.utc),
+            )
+            for day in (1, 2)
+        ]
+        for performance in self.performances:
+            reservation = Reservation.objects.create(user=self.user)
+            for seat in (1, 2):
+                Ticket.objects.create(
+                    row=1,
+                    seat=seat,
+                    performance=performance,
+                    reservation=reservation,
+                )
+
+    def test_tickets_csv_export(self):
+        response = self.client.get(
+            "/api/theatre/exports/tickets.csv",
+            {"performance": self.performances[0].id},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:2], ["id", "reservation_id"])
+        self.assertEqual(len(lines), 3)
+        self.assertIn("Hamlet", lines[1])
+
+    def test_reservations_ndjson_export(self):
+        response = self.client.get("/api/theatre/exports/reservations.ndjson")
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual([row["tickets"] for row in rows], [2, 2])
+        self.assertEqual(rows[0]["user_email"], "admin@example.com")
+
+    def test_export_date_range(self):
+        response = self.client.get(
+            "/api/theatre/exports/tickets.ndjson",
+            {"date_from": "2000-01-01", "date_to": "2000-01-31"},
+        )
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+        response = self.client.get(
+            "/api/theatre/exports/tickets.ndjson", {"date_from": "tomorrow"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, {"user": "1/min"})
+    def test_exports_are_not_throttled(self):
+        for name in ("tickets.csv", "reservations.csv", "tickets.ndjson"):
+            response = self.client.get(f"/api/theatre/exports/{name}")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_export_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get("/api/theatre/exports/tickets.csv")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,113 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from theatre.models import Play, TheatreHall, Performance, Ticket, Reservation
+
+
+class AsyncReadEndpointsTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="pass1234"
+        )
+        self.auth = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+        }
+        self.play = Play.objects.create(title="Hamlet", description="Tragedy")
+        self.hall = TheatreHall.objects.create(name="Main Hall", rows=2, seats_in_row=2)
+        self.performances = [
+            Performance.objects.create(
+                play=self.play,
+                theatre_hall=self.hall,
+                show_time=datetime(2025, 12, day, 19, 0, tzinfo=timezone.utc),
+            )
+            for day in (3, 1, 2)
+        ]
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, performance=self.performances[0], reservation=reservation
+        )
+
+    async def test_performance_list_keyset_pages(self):
+        response = await self.async_client.get(
+            "/api/theatre/async/performances/", {"page_size": 2}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first_page = response.json()
+        response = await self.async_client.get(first_page["next"])
+        second_page = response.json()
+        show_times = [
+            item["show_time"]
+            for item in first_page["results"] + second_page["results"]
+        ]
+        self.assertEqual(show_times, sorted(show_times))
+        self.assertEqual(len(show_times), 3)
+        self.assertIsNone(second_page["next"])
+
+    async def test_performance_list_non_positive_page_size(self):
+        for page_size in (0, -3):
+            response = await self.async_client.get(
+                "/api/theatre/async/performances/", {"page_size": page_size}
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.json()["results"]), 1)
+
+    async def test_performance_list_invalid_filter(self):
+        response = await self.async_client.get(
+            "/api/theatre/async/performances/", {"date": "tomorrow"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date", response.json())
+
+    async def test_performance_detail(self):
+        response = await self.async_client.get(
+            f"/api/theatre/async/performances/{self.performances[0].id}/"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["taken_places"]), 1)
+        self.assertEqual(response.json()["play"]["title"], "Hamlet")
+
+    async def test_performance_detail_not_found(self):
+        response = await self.async_client.get(
+            "/api/theatre/async/performances/0/"
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @mock.patch.dict(
+        SimpleRateThrottle.THROTTLE_RATES, {"seat_browsing": "1/min"}
+    )
+    async def test_seat_map_is_throttled(self):
+        url = (
+            f"/api/theatre/async/performances/{self.performances[0].id}"
+            "/seat-map/"
+        )
+        response = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = await self.async_client.get(url, headers=self.auth)
+        self.assertEqual(
+            response.status_code, status.HTTP_429_TOO_MANY_REQUESTS
+        )
+        self.assertEqual(response["Retry-After"], "60")
+
+    async def test_play_list_requires_authentication(self):
+        response = await self.async_client.get("/api/theatre/async/plays/")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.async_client.get(
+            "/api/theatre/async/plays/", headers=self.auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][0]["title"], "Hamlet")
+
+    async def test_export_streams_under_asgi(self):
+        response = await self.async_client.get(
+            "/api/theatre/exports/tickets.csv", headers=self.auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.decode().splitlines()), 2)
@@ -0,0 +1,185 @@
+import os
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from datetime import datetime, timezone
+from PIL import Image
+
+from theatre.models import Play, TheatreHall, Performance, Ticket, Reservation
+from theatre.storage import ContentAddressedStorage
+
+
+class ReconcileTicketsSoldTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.play = Play.objects.create(title="Hamlet", description="Tragedy")
+        self.hall = TheatreHall.objects.create(name="Small Hall", rows=2, seats_in_row=2)
+        self.performance = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.hall,
+            show_time=datetime(2025, 12, 1, 19, 0, tzinfo=timezone.utc),
+        )
+        self.reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=1, seat=1, performance=self.performance, reservation=self.reservation
+        )
+        Ticket.objects.create(
+            row=1, seat=2, performance=self.performance, reservation=self.reservation
+        )
+
+    def test_tickets_sold_follows_tickets(self):
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+        self.reservation.delete()
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 0)
+
+    def test_reconcile_tickets_sold(self):
+        Performance.objects.update(tickets_sold=7, seat_map=b"")
+        out = StringIO()
+        call_command("reconcile_tickets_sold", stdout=out)
+        self.performance.refresh_from_db()
+        self.assertEqual(self.performance.tickets_sold, 2)
+        self.assertTrue(self.performance.is_seat_taken(1, 2))
+        self.assertIn("Reconciled 1 performance(s)", out.getvalue())
+
+
+class SeedTheatreTest(TestCase):
+    seed_args = (
+        "--actors", "5", "--genres", "3", "--plays", "3", "--halls", "2",
+        "--performances-per-play", "2", "--users", "4",
+        "--min-rows", "3", "--max-rows", "4",
+        "--min-seats-in-row", "3", "--max-seats-in-row", "5",
+        "--batch-size", "7",
+    )
+
+    def assert_seeded(self):
+        self.assertEqual(Play.objects.count(), 3)
+        self.assertEqual(Performance.objects.count(), 6)
+        for performance in Performance.objects.select_related("theatre_hall"):
+            tickets = list(performance.tickets.values_list("row", "seat"))
+            self.assertEqual(performance.tickets_sold, len(tickets))
+            for row, seat in tickets:
+                self.assertTrue(performance.is_seat_taken(row, seat))
+        self.assertFalse(Reservation.objects.filter(tickets=None).exists())
+
+    def test_seed_theatre(self):
+        out = StringIO()
+        call_command("seed_theatre", *self.seed_args, stdout=out)
+        self.assert_seeded()
+        self.assertIn('"plays": 3', out.getvalue())
+
+    def test_seed_theatre_without_copy(self):
+        call_command(
+            "seed_theatre", *self.seed_args, "--no-copy", stdout=StringIO()
+        )
+        self.assert_seeded()
+
+
+class ContentAddressedStorageTest(SimpleTestCase):
+    def test_identical_files_stored_once(self):
+        with tempfile.TemporaryDirectory() as location:
+            storage = ContentAddressedStorage(location=location)
+            first = storage.save("images/a.JPG", ContentFile(b"poster"))
+            second = storage.save("images/b.jpg", ContentFile(b"poster"))
+            other = storage.save("images/c.jpg", ContentFile(b"other"))
+
+            self.assertEqual(first, second)
+            self.assertNotEqual(first, other)
+            self.assertTrue(first.startswith("images/"))
+            self.assertTrue(first.endswith(".jpg"))
+            files = [
+                name for _, _, names in os.walk(location) for name in names
+            ]
+            self.assertEqual(len(files), 2)
+
+
+class CollectMediaGarbageTest(TestCase):
+    def setUp(self):
+        # The command deletes every unreferenced file under MEDIA_ROOT
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_unreferenced_files_deleted(self):
+        kept = default_storage.save("images/kept.jpg", ContentFile(b"kept"))
+        rendition = default_storage.save(
+            "images/renditions/kept.webp", ContentFile(b"rendition")
+        )
+        orphan = default_storage.save("images/orphan.jpg", ContentFile(b"orphan"))
+        Play.objects.create(
+            title="Hamlet",
+            description="Tragedy",
+            image=kept,
+            image_renditions={"thumbnail": rendition},
+        )
+
+        call_command("collect_media_garbage", "--min-age", "3600", stdout=StringIO())
+        self.assertTrue(default_storage.exists(orphan))
+
+        out = StringIO()
+        call_command("collect_media_garbage", "--min-age", "0", stdout=out)
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(kept))
+        self.assertTrue(default_storage.exists(rendition))
+        self.assertIn("Freed 6 bytes in 1 unreferenced file(s)", out.getvalue())
+
+
+class RenderPlayImagesTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_missing_renditions_rendered(self):
+        buffer = BytesIO()
+        Image.new("RGB", (800, 600)).save(buffer, format="PNG")
+        image = default_storage.save(
+            "images/poster.png", ContentFile(buffer.getvalue())
+        )
+        pending = Play.objects.create(
+            title="Hamlet", description="Tragedy", image=image
+        )
+        Play.objects.create(title="Othello", description="Tragedy")
+        out = StringIO()
+
+        call_command("render_play_images", stdout=out)
+
+        pending.refresh_from_db()
+        self.assertEqual(
+            set(pending.image_renditions), {"thumbnail", "card", "hero"}
+        )
+        self.assertIn("Rendered 1 play image(s), 0 failed", out.getvalue())
+
+
+class WaitForDbTest(TestCase):
+    def test_pool_timeout_raises_command_error(self):
+        from psycopg_pool import PoolTimeout
+
+        pool = mock.Mock()
+        pool.wait.side_effect = PoolTimeout("pool empty")
+        with mock.patch.object(
+            type(connections["default"]),
+            "pool",
+            new_callable=mock.PropertyMock,
+            return_value=pool,
+        ):
+            with self.assertRaisesMessage(
+                CommandError, "Connection pool not ready after 0.1 seconds"
+            ):
+                call_command(
+                    "wait_for_db", "--pool-timeout", "0.1", stdout=StringIO()
+                )
@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from theatre.models import Play, TheatreHall, Performance
+from theatre.views import PerformanceViewSet
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN plans are Postgres specific")
+class PerformanceScheduleIndexTest(TestCase):
+    def setUp(self):
+        play = Play.objects.create(title="Hamlet", description="Tragedy")
+        hall = TheatreHall.objects.create(name="Main Hall", rows=2, seats_in_row=2)
+        Performance.objects.create(
+            play=play,
+            theatre_hall=hall,
+            show_time=datetime(2025, 12, 1, 19, 0, tzinfo=timezone.utc),
+        )
+        self.play = play
+        self.hall = hall
+        # Other plays in another hall on the same day make the
+        # play and hall indexes the selective ones
+        other_play = Play.objects.create(title="Othello", description="Tragedy")
+        other_hall = TheatreHall.objects.create(name="Big Hall", rows=2, seats_in_row=2)
+        Performance.objects.bulk_create(
+            Performance(
+                play=other_play,
+                theatre_hall=other_hall,
+                show_time=datetime(2025, 12, 1, 12, minute, tzinfo=timezone.utc),
+            )
+            for minute in range(50)
+        )
+        # Tiny test tables would be scanned sequentially anyway
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE theatre_performance")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def schedule_plan(self, **params):
+        request = Request(APIRequestFactory().get("/", params))
+        view = PerformanceViewSet(action="list", request=request)
+        queryset = view.get_queryset().order_by("show_time", "id")
+        return queryset.explain()
+
+    def assertUsesIndex(self, plan, index_name):
+        self.assertIn(index_name, plan, msg=plan)
+
+    def test_date_filter_uses_show_time_index(self):
+        plan = self.schedule_plan(date="2025-12-01")
+        self.assertUsesIndex(plan, "performance_show_time_idx")
+
+    def test_play_filter_uses_play_show_time_index(self):
+        plan = self.schedule_plan(play=self.play.id, date="2025-12-01")
+        self.assertUsesIndex(plan, "performance_play_show_idx")
+
+    def test_theatre_hall_filter_uses_hall_show_time_index(self):
+        plan = self.schedule_plan(theatre_hall=self.hall.id)
+        self.assertUsesIndex(plan, "performance_hall_show_idx")
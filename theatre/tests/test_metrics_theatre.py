@@ -0,0 +1,147 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from theatre.metrics import MetricsRegistry, archive_process, registry
+from theatre.models import Play, TheatreHall, Performance
+
+
+class MetricsRegistryTest(SimpleTestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.counter = self.registry.counter(
+            "test_total", "Test counter.", ("kind",)
+        )
+        self.histogram = self.registry.histogram(
+            "test_seconds", "Test histogram.", buckets=(0.1, 1.0)
+        )
+
+    def test_thread_shards_are_summed(self):
+        def work():
+            for _ in range(1000):
+                self.counter.inc(kind="a")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertIn('test_total{kind="a"} 4000', self.registry.render())
+
+    def test_histogram_text_format(self):
+        self.histogram.observe(0.05)
+        self.histogram.observe(0.5)
+        self.histogram.observe(5)
+        text = self.registry.render()
+        self.assertIn("# TYPE test_seconds histogram", text)
+        self.assertIn('test_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('test_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("test_seconds_count 3", text)
+
+    def test_multiprocess_aggregation(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "1.json"), "w") as file:
+                json.dump([[["test_total", "", ["a"]], 5]], file)
+            with override_settings(METRICS_MULTIPROC_DIR=directory):
+                self.counter.inc(2, kind="a")
+                self.registry.flush()
+                self.assertTrue(
+                    os.path.exists(
+                        os.path.join(directory, f"{os.getpid()}.json")
+                    )
+                )
+                text = self.registry.render()
+        self.assertIn('test_total{kind="a"} 7', text)
+
+    def test_exited_worker_is_archived(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "1.json")
+            with open(path, "w") as file:
+                json.dump([[["test_total", "", ["a"]], 5]], file)
+            archive_process(directory, 1)
+            self.assertFalse(os.path.exists(path))
+
+            # A new worker reusing the pid adds to the archived counts
+            with open(path, "w") as file:
+                json.dump([[["test_total", "", ["a"]], 1]], file)
+            with override_settings(METRICS_MULTIPROC_DIR=directory):
+                text = self.registry.render()
+        self.assertIn('test_total{kind="a"} 6', text)
+
+
+class PrometheusMetricsAPITest(TestCase):
+    url = "/api/theatre/metrics/prometheus/"
+
+    def setUp(self):
+        registry.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="admin@example.com", password="pass1234"
+        )
+        self.client.force_authenticate(user=self.user)
+        hall = TheatreHall.objects.create(name="Small", rows=2, seats_in_row=2)
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Hamlet", description="Tragedy"),
+            theatre_hall=hall,
+            show_time=datetime(2025, 12, 1, 19, 0, tzinfo=timezone.utc),
+        )
+
+    def reserve(self, *seats):
+        return self.client.post(
+            "/api/theatre/reservations/",
+            {"tickets": [
+                {"row": row, "seat": seat, "performance": self.performance.id}
+                for row, seat in seats
+            ]},
+            format="json",
+        )
+
+    def test_metrics_forbidden_for_regular_users(self):
+        user = get_user_model().objects.create_user(
+            email="user@example.com", password="pass1234", is_staff=False
+        )
+        self.client.force_authenticate(user=user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_booking_metrics(self):
+        self.reserve((1, 1), (1, 2))
+        self.reserve((1, 2))
+
+        response = APIClient().get(
+            self.url, HTTP_X_METRICS_TOKEN="scrape-secret"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        text = response.content.decode()
+        self.assertIn("theatre_reservations_created_total 1", text)
+        self.assertIn("theatre_tickets_sold_total 2", text)
+        self.assertIn(
+            'theatre_reservation_conflicts_total{reason="taken"} 1', text
+        )
+        self.assertIn(
+            'theatre_request_duration_seconds_count'
+            '{view="POST theatre:reservation-list"} 2',
+            text,
+        )
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    @mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, {"anon": "1/min"})
+    def test_token_scrapes_are_not_throttled(self):
+        scraper = APIClient()
+        for _ in range(12):
+            response = scraper.get(
+                self.url, HTTP_X_METRICS_TOKEN="scrape-secret"
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -29,10 +29,14 @@ class TicketSerializerTest(TestCase):
         serializer = TicketSerializer(data=data)
         self.assertTrue(serializer.is_valid())
 
-    def test_invalid_ticket_out_of_range(self):
-        data = {"row": 3, "seat": 1, "performance": self.performance.id}
+    def test_performance_is_a_plain_id(self):
+        data = {"row": 1, "seat": 1, "performance": self.performance.id}
         serializer = TicketSerializer(data=data)
-        self.assertFalse(serializer.is_valid())
+        with self.assertNumQueries(0):
+            self.assertTrue(serializer.is_valid())
+        self.assertEqual(
+            serializer.validated_data["performance_id"], self.performance.id
+        )
 
 
 class PerformanceSerializerTest(TestCase):
@@ -113,6 +117,76 @@ class ReservationSerializerTest(TestCase):
         with self.assertRaises(ValidationError):
             serializer.is_valid(raise_exception=True)
 
+    def test_reservation_fails_on_duplicated_seat(self):
+        data = {
+            "tickets": [
+                {"row": 1, "seat": 1, "performance": self.performance.id},
+                {"row": 1, "seat": 1, "performance": self.performance.id},
+            ]
+        }
+        serializer = ReservationSerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+
+    def test_reservation_fails_on_seat_out_of_range(self):
+        data = {"tickets": [{"row": 3, "seat": 1, "performance": self.performance.id}]}
+        serializer = ReservationSerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("row", serializer.errors)
+
+    def test_reservation_fails_on_unknown_performance(self):
+        data = {"tickets": [{"row": 1, "seat": 1, "performance": 0}]}
+        serializer = ReservationSerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("performance", serializer.errors)
+
+    def test_reservation_loads_performances_once(self):
+        other = Performance.objects.create(
+            play=self.play,
+            theatre_hall=self.hall,
+            show_time=datetime(2025, 12, 2, 19, 0, tzinfo=timezone.utc),
+        )
+        data = {
+            "tickets": [
+                {"row": row, "seat": seat, "performance": performance.id}
+                for performance in (self.performance, other)
+                for row in (1, 2)
+                for seat in (1, 2)
+            ]
+        }
+        serializer = ReservationSerializer(data=data)
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+
+    def test_reservation_create_updates_seat_map(self):
+        data = {
+            "tickets": [
+                {"row": 2, "seat": 1, "performance": self.performance.id},
+                {"row": 2, "seat": 2, "performance": self.performance.id},
+            ]
+        }
+        serializer = ReservationSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        serializer.save(user=self.user)
+        self.performance.refresh_from_db()
+        self.assertTrue(self.performance.is_seat_taken(2, 1))
+        self.assertTrue(self.performance.is_seat_taken(2, 2))
+        self.assertFalse(self.performance.is_seat_taken(1, 1))
+
+    def test_hall_resize_rebuilds_seat_map(self):
+        reservation = Reservation.objects.create(user=self.user)
+        Ticket.objects.create(
+            row=2, seat=1,
+            performance=self.performance,
+            reservation=reservation
+        )
+        self.hall.seats_in_row = 3
+        self.hall.save()
+
+        self.performance.refresh_from_db()
+        self.assertTrue(self.performance.is_seat_taken(2, 1))
+        self.assertFalse(self.performance.is_seat_taken(1, 3))
+        self.assertEqual(self.performance.tickets_sold, 1)
+
     def test_reservation_list_serializer(self):
         reservation = Reservation.objects.create(user=self.user)
         Ticket.objects.create(
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from theatre.serving import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+
+CONTENT = b"0123456789" * 10
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+class FileServingTests(SimpleTestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.hashed_url = f"/media/images/{DIGEST[:2]}/{DIGEST}.jpg"
+        self.write(f"images/{DIGEST[:2]}/{DIGEST}.jpg")
+        self.write("notes.txt")
+
+    def write(self, name):
+        path = os.path.join(self.media_root.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(CONTENT)
+
+    def test_hashed_media_is_immutable(self):
+        res = self.client.get(self.hashed_url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+        self.assertEqual(res["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(res["ETag"], f'"{DIGEST}"')
+        self.assertEqual(res["Content-Type"], "image/jpeg")
+
+    def test_unhashed_media_is_revalidated(self):
+        res = self.client.get("/media/notes.txt")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Cache-Control"], REVALIDATE_CACHE_CONTROL)
+
+        res = self.client.get(
+            "/media/notes.txt", HTTP_IF_NONE_MATCH=res["ETag"]
+        )
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res["Cache-Control"], REVALIDATE_CACHE_CONTROL)
+
+    def test_byte_range(self):
+        res = self.client.get(self.hashed_url, HTTP_RANGE="bytes=10-19")
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[10:20])
+        self.assertEqual(res["Content-Length"], "10")
+        self.assertEqual(res["Content-Range"], f"bytes 10-19/{len(CONTENT)}")
+
+    def test_suffix_range(self):
+        res = self.client.get(self.hashed_url, HTTP_RANGE="bytes=-5")
+
+        self.assertEqual(res.status_code, 206)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT[-5:])
+
+    def test_unsatisfiable_range(self):
+        res = self.client.get(self.hashed_url, HTTP_RANGE="bytes=500-")
+
+        self.assertEqual(res.status_code, 416)
+        self.assertEqual(res["Content-Range"], f"bytes */{len(CONTENT)}")
+
+    def test_stale_if_range_sends_whole_file(self):
+        res = self.client.get(
+            self.hashed_url, HTTP_RANGE="bytes=0-4", HTTP_IF_RANGE='"stale"'
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b"".join(res.streaming_content), CONTENT)
+
+    def test_missing_and_escaping_paths_are_not_found(self):
+        self.assertEqual(self.client.get("/media/missing.jpg").status_code, 404)
+        self.assertEqual(self.client.get("/media/images").status_code, 404)
+        self.assertEqual(
+            self.client.get("/media/..%2F..%2Fetc%2Fpasswd").status_code, 404
+        )
+
+    def test_only_safe_methods(self):
+        self.assertEqual(self.client.post(self.hashed_url).status_code, 405)
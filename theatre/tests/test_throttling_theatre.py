@@ -0,0 +1,137 @@
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from theatre.models import Play, TheatreHall, Performance, ThrottleBucket
+from theatre.throttling import CacheThrottleStore, DatabaseThrottleStore
+
+THROTTLE_RATES = {
+    "anon": None,
+    "user": "1/min",
+    "seat_browsing": "3/min",
+    "reservations": "1/min",
+}
+
+
+class ThrottleStoreTest(TestCase):
+    def assert_token_bucket(self, store):
+        # Two tokens, refilled at one token per 10 seconds
+        def consume(now):
+            return store.consume("throttle_test_1", capacity=2, rate=0.1, now=now)
+
+        self.assertEqual(consume(1000), 0)
+        self.assertEqual(consume(1000), 0)
+        self.assertAlmostEqual(consume(1001), 9)
+        self.assertEqual(consume(1010), 0)
+        self.assertAlmostEqual(consume(1010), 10)
+
+    def test_database_store(self):
+        self.assert_token_bucket(DatabaseThrottleStore())
+        self.assertEqual(ThrottleBucket.objects.count(), 1)
+
+    def test_purged_bucket_counts_as_full(self):
+        # The upsert finds no token, then the row is gone
+        with mock.patch(
+            "theatre.throttling.CONSUME_SQL", "SELECT 1 WHERE false"
+        ):
+            wait = DatabaseThrottleStore().consume(
+                "throttle_test_1", capacity=2, rate=0.1, now=1000
+            )
+        self.assertEqual(wait, 0)
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "throttle-test",
+            }
+        },
+        THROTTLE_CACHE="default",
+    )
+    def test_cache_store(self):
+        self.assert_token_bucket(CacheThrottleStore())
+
+    def test_purge_idle_buckets(self):
+        ThrottleBucket.objects.create(key="idle", tokens=0, updated_at=0)
+        ThrottleBucket.objects.create(key="busy", tokens=0, updated_at=2e9)
+        out = StringIO()
+
+        call_command("purge_throttle_buckets", stdout=out)
+
+        self.assertEqual(
+            list(ThrottleBucket.objects.values_list("key", flat=True)),
+            ["busy"],
+        )
+        self.assertIn("Deleted 1 idle throttle bucket(s)", out.getvalue())
+
+
+@mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, THROTTLE_RATES)
+class ScopedThrottleAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(self.user)
+        hall = TheatreHall.objects.create(name="Hall", rows=2, seats_in_row=2)
+        self.performance = Performance.objects.create(
+            play=Play.objects.create(title="Hamlet", description="Tragedy"),
+            theatre_hall=hall,
+            show_time=datetime(2030, 1, 1, 19, 0, tzinfo=timezone.utc),
+        )
+        # Seat browsing buckets live in the cache
+        cache.clear()
+
+    def test_scopes_have_separate_budgets(self):
+        for _ in range(3):
+            res = self.client.get("/api/theatre/performances/")
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get("/api/theatre/performances/")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", res)
+
+        payload = {
+            "tickets": [
+                {"row": 1, "seat": 1, "performance": self.performance.id}
+            ]
+        }
+        res = self.client.post(
+            "/api/theatre/reservations/", payload, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        payload["tickets"][0]["seat"] = 2
+        res = self.client.post(
+            "/api/theatre/reservations/", payload, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_scoped_actions_skip_global_budget(self):
+        for _ in range(3):
+            self.client.get("/api/theatre/performances/")
+
+        # The user budget of 1/min was not spent on seat browsing
+        res = self.client.get("/api/theatre/genres/")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.get("/api/theatre/genres/")
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_not_modified_writes_no_bucket(self):
+        response = self.client.get("/api/theatre/performances/")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/api/theatre/performances/",
+                HTTP_IF_NONE_MATCH=response["ETag"],
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(ThrottleBucket.objects.exists())
@@ -0,0 +1,175 @@
+"""
+Token bucket throttling on a shared store. A bucket is two numbers,
+tokens left and the time they were counted, so a check is O(1) and
+the same budget holds across every worker using the store.
+"""
+import math
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.utils.module_loading import import_string
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    UserRateThrottle,
+)
+
+from theatre.models import ThrottleBucket
+
+_table = ThrottleBucket._meta.db_table
+
+# The bucket is refilled for the elapsed time and a token is taken in
+# one statement. Without a token the WHERE skips the update and no row
+# is returned.
+CONSUME_SQL = f"""
+    INSERT INTO {_table} AS bucket (key, tokens, updated_at)
+    VALUES (%(key)s, %(capacity)s - 1, %(now)s)
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = LEAST(
+            %(capacity)s,
+            bucket.tokens + (EXCLUDED.updated_at - bucket.updated_at) * %(rate)s
+        ) - 1,
+        updated_at = EXCLUDED.updated_at
+    WHERE LEAST(
+        %(capacity)s,
+        bucket.tokens + (EXCLUDED.updated_at - bucket.updated_at) * %(rate)s
+    ) >= 1
+    RETURNING tokens
+"""
+
+
+def refill_wait(tokens, updated_at, capacity, rate, now):
+    """Seconds until a bucket holds a whole token again"""
+    tokens = min(capacity, tokens + (now - updated_at) * rate)
+    return max(1 - tokens, 0) / rate
+
+
+class DatabaseThrottleStore:
+    """Buckets in the ThrottleBucket table, shared by all processes"""
+
+    def consume(self, key, capacity, rate, now):
+        """Take a token: 0 when allowed, else seconds until one is back"""
+        params = {"key": key, "capacity": capacity, "rate": rate, "now": now}
+        with connection.cursor() as cursor:
+            cursor.execute(CONSUME_SQL, params)
+            if cursor.fetchone() is not None:
+                return 0
+            cursor.execute(
+                f"SELECT tokens, updated_at FROM {_table} WHERE key = %s",
+                [key],
+            )
+            row = cursor.fetchone()
+        if row is None:
+            # Purged since the upsert, a missing bucket is a full one
+            return 0
+        tokens, updated_at = row
+        return refill_wait(tokens, updated_at, capacity, rate, now)
+
+
+class CacheThrottleStore:
+    """
+    Buckets in the THROTTLE_CACHE cache. Updates are atomic within a
+    process only, use a cache every worker shares (file based, Redis).
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE]
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now):
+        with self._lock:
+            tokens, updated_at = self.cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            if tokens < 1:
+                return refill_wait(tokens, now, capacity, rate, now)
+            # An expired bucket is a full one
+            self.cache.set(
+                key,
+                (tokens - 1, now),
+                timeout=math.ceil((capacity - tokens + 1) / rate),
+            )
+        return 0
+
+
+_stores = {}
+
+
+def get_throttle_store(scope=None):
+    """Store of the scope in THROTTLE_SCOPE_STORES, else THROTTLE_STORE"""
+    path = settings.THROTTLE_SCOPE_STORES.get(scope, settings.THROTTLE_STORE)
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
+
+
+def view_throttle_scope(view):
+    """
+    Scope the view names for the current action in `throttle_scopes`
+    (or for every action in `throttle_scope`), None if it has none
+    """
+    return getattr(view, "throttle_scopes", {}).get(
+        getattr(view, "action", None),
+        getattr(view, "throttle_scope", None),
+    )
+
+
+class TokenBucketMixin:
+    """
+    SimpleRateThrottle on a token bucket: a rate of N/period allows
+    bursts of N requests and refills N tokens over the period.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.wait_seconds = get_throttle_store(self.scope).consume(
+            self.key,
+            capacity=self.num_requests,
+            rate=self.num_requests / self.duration,
+            now=self.timer(),
+        )
+        return self.wait_seconds == 0
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class UnscopedMixin:
+    """Global budget of actions without a throttle scope of their own"""
+
+    def allow_request(self, request, view):
+        if view_throttle_scope(view):
+            return True
+        return super().allow_request(request, view)
+
+
+class AnonTokenBucketThrottle(
+    UnscopedMixin, TokenBucketMixin, AnonRateThrottle
+):
+    pass
+
+
+class UserTokenBucketThrottle(
+    UnscopedMixin, TokenBucketMixin, UserRateThrottle
+):
+    pass
+
+
+class ScopedTokenBucketThrottle(TokenBucketMixin, ScopedRateThrottle):
+    """Budget of the view_throttle_scope of the current action"""
+
+    def allow_request(self, request, view):
+        self.scope = view_throttle_scope(view)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return TokenBucketMixin.allow_request(self, request, view)
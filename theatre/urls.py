@@ -1,12 +1,17 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
+from theatre import async_views
 from theatre.views import (
     PlayViewSet,
     ActorViewSet,
     GenreViewSet,
     TheatreHallViewSet,
     PerformanceViewSet,
-    ReservationViewSet
+    ReservationViewSet,
+    SeatHoldViewSet,
+    RequestMetricsView,
+    PrometheusMetricsView,
+    SalesExportView,
 )
 
 app_name = "theatre"
@@ -17,7 +22,45 @@ router.register("genres", GenreViewSet)
 router.register("theatre_halls", TheatreHallViewSet)
 router.register("performances", PerformanceViewSet)
 router.register("reservations", ReservationViewSet)
+router.register("seat_holds", SeatHoldViewSet)
+
+async_urlpatterns = [
+    path(
+        "performances/",
+        async_views.performance_list,
+        name="async-performance-list",
+    ),
+    path(
+        "performances/<int:pk>/",
+        async_views.performance_detail,
+        name="async-performance-detail",
+    ),
+    path(
+        "performances/<int:pk>/seat-map/",
+        async_views.performance_seat_map,
+        name="async-performance-seat-map",
+    ),
+    path("plays/", async_views.play_list, name="async-play-list"),
+    path(
+        "plays/<int:pk>/",
+        async_views.play_detail,
+        name="async-play-detail",
+    ),
+]
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("async/", include(async_urlpatterns)),
+    path("metrics/", RequestMetricsView.as_view(), name="metrics"),
+    path(
+        "metrics/prometheus/",
+        PrometheusMetricsView.as_view(),
+        name="metrics-prometheus",
+    ),
+    re_path(
+        r"^exports/(?P<export>tickets|reservations)"
+        r"\.(?P<export_format>csv|ndjson)$",
+        SalesExportView.as_view(),
+        name="export",
+    ),
 ]
\ No newline at end of file
@@ -1,14 +1,45 @@
 from rest_framework import viewsets, mixins, status
-from datetime import datetime
-from django.db.models import F, Count
+from datetime import datetime, time, timedelta
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Count, F, FloatField, Max, Prefetch, Sum
+from django.db.models.functions import Cast
+from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from theatre.cache import (
+    catalogue_cache_key,
+    get_catalogue_version,
+    get_or_set_catalogue_response,
+)
+from theatre.conditional import ConditionalGetMixin
+from theatre.exports import export_response
+from theatre.images import schedule_play_image
+from theatre.instrumentation import SerializerTimingMixin, request_metrics
+from theatre.metrics import PrometheusTextRenderer, registry
 from theatre.models import (
-    Play, Actor, Genre, TheatreHall, Performance, Reservation
+    Play,
+    Actor,
+    Genre,
+    TheatreHall,
+    Performance,
+    Reservation,
+    Ticket,
+    SeatHold,
+)
+from theatre.pagination import (
+    PlayCursorPagination,
+    PerformanceCursorPagination,
+    ReservationCursorPagination,
+)
+from theatre.permissions import (
+    HasMetricsToken,
+    IsAdminOrIfAuthenticatedReadOnly,
 )
-from theatre.permissions import IsAdminOrIfAuthenticatedReadOnly
 from theatre.serializers import (
     ActorSerializer,
     GenreSerializer,
@@ -18,26 +49,33 @@ from theatre.serializers import (
     PerformanceSerializer,
     PerformanceListSerializer,
     PerformanceDetailSerializer,
+    PerformanceSeatMapSerializer,
+    PerformanceBulkScheduleSerializer,
     ReservationSerializer,
     ReservationListSerializer,
-    PlayImageSerializer, PlayListSerializer
+    PlayImageSerializer, PlayListSerializer,
+    SeatHoldSerializer,
+    SeatHoldCreateSerializer,
 )
 
 
-class ActorViewSet(viewsets.ModelViewSet):
+class ActorViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = Actor.objects.all()
     serializer_class = ActorSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly, )
 
 
-class GenreViewSet(viewsets.ModelViewSet):
+class GenreViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly, )
 
 
-class PlayViewSet(viewsets.ModelViewSet):
+class PlayViewSet(
+    SerializerTimingMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     queryset = Play.objects.prefetch_related("genres", "actors")
+    pagination_class = PlayCursorPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly, )
 
     @staticmethod
@@ -45,19 +83,33 @@ class PlayViewSet(viewsets.ModelViewSet):
         return [int(str_id) for str_id in qs.split(",")]
 
     def get_queryset(self):
-        title = self.request.query_params.get("title")
-        genres = self.request.query_params.get("genres")
-        actors = self.request.query_params.get("actors")
-
-        queryset = self.queryset
-
+        return self.filter_catalogue(self.queryset, self.request.query_params)
+
+    @classmethod
+    def filter_catalogue(cls, queryset, query_params):
+        q = query_params.get("q")
+        title = query_params.get("title")
+        genres = query_params.get("genres")
+        actors = query_params.get("actors")
+
+        if q:
+            search_query = SearchQuery(
+                q, search_type="websearch", config="english"
+            )
+            queryset = queryset.filter(search_vector=search_query).annotate(
+                # Double precision keeps rank cursors exact
+                search_rank=Cast(
+                    SearchRank(F("search_vector"), search_query),
+                    FloatField(),
+                )
+            )
         if title:
             queryset = queryset.filter(title__icontains=title)
         if genres:
-            genres_ids = self._params_to_ints(genres)
+            genres_ids = cls._params_to_ints(genres)
             queryset = queryset.filter(genres__id__in=genres_ids)
         if actors:
-            actors_ids = self._params_to_ints(actors)
+            actors_ids = cls._params_to_ints(actors)
             queryset = queryset.filter(actors__id__in=actors_ids)
         return queryset.distinct()
 
@@ -74,7 +126,7 @@ class PlayViewSet(viewsets.ModelViewSet):
         methods=["POST"],
         detail=True,
         url_path="upload-image",
-        permission_classes=[],
+        permission_classes=[IsAdminUser],
     )
     def upload_image(self, request, pk=None):
         """Endpoint for uploading image to specific play"""
@@ -84,9 +136,17 @@ class PlayViewSet(viewsets.ModelViewSet):
         )
 
         serializer.is_valid(raise_exception=True)
-        serializer.save()
+        # Renditions of the previous image do not show the new one.
+        # Empty renditions also mark the play for render_play_images
+        # in case the background job is lost.
+        play = serializer.save(image_renditions={})
+        schedule_play_image(play)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def get_conditional_state(self, request, *args, **kwargs):
+        # Any catalogue change bumps the version, so it is the fingerprint
+        return get_catalogue_version(), None
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -104,13 +164,41 @@ class PlayViewSet(viewsets.ModelViewSet):
                 type=OpenApiTypes.STR,
                 description="Filter by movie title (ex. ?title=fiction)",
             ),
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Full-text search over title, description, genres "
+                    "and actors, best matches first (ex. ?q=danish prince)"
+                ),
+            ),
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            request,
+            lambda: Response(get_or_set_catalogue_response(
+                catalogue_cache_key(request, "list"),
+                lambda: super(PlayViewSet, self).list(
+                    request, *args, **kwargs
+                ).data,
+            )),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            lambda: Response(get_or_set_catalogue_response(
+                catalogue_cache_key(request, "retrieve", kwargs.get("pk")),
+                lambda: super(PlayViewSet, self).retrieve(
+                    request, *args, **kwargs
+                ).data,
+            )),
+        )
 
 
 class TheatreHallViewSet(
+    SerializerTimingMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     viewsets.GenericViewSet,
@@ -120,31 +208,65 @@ class TheatreHallViewSet(
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly, )
 
 
-class PerformanceViewSet(viewsets.ModelViewSet):
+class PerformanceViewSet(
+    SerializerTimingMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     queryset = (
         Performance.objects.all()
         .select_related("play", "theatre_hall")
+        .defer("seat_map")
         .annotate(
             tickets_available=(
                 F("theatre_hall__rows") * F("theatre_hall__seats_in_row")
-                - Count("tickets"))
+                - F("tickets_sold"))
             )
         )
     serializer_class = PerformanceListSerializer
+    pagination_class = PerformanceCursorPagination
+    throttle_scopes = {
+        "list": "seat_browsing",
+        "retrieve": "seat_browsing",
+        "seat_map": "seat_browsing",
+    }
 
     def get_queryset(self):
-        date = self.request.query_params.get("data")
-        play_id_str = self.request.query_params.get("play")
+        if self.action == "seat_map":
+            return Performance.objects.select_related("theatre_hall")
 
-        queryset = self.queryset
+        return self.filter_schedule(self.queryset, self.request.query_params)
+
+    @staticmethod
+    def filter_schedule(queryset, query_params):
+        date = query_params.get("date")
+        play_id_str = query_params.get("play")
+        theatre_hall_id_str = query_params.get("theatre_hall")
 
         if date:
-            date = datetime.strptime(date, "%Y-%m-%d").date()
-            queryset = queryset.filter(show_time__date=date)
+            try:
+                date = datetime.strptime(date, "%Y-%m-%d").date()
+            except ValueError:
+                raise ValidationError(
+                    {"date": "Date must be in YYYY-MM-DD format"}
+                )
+            # Half-open range keeps show_time indexes usable
+            day_start = timezone.make_aware(datetime.combine(date, time.min))
+            queryset = queryset.filter(
+                show_time__gte=day_start,
+                show_time__lt=day_start + timedelta(days=1),
+            )
 
         if play_id_str:
+            if not play_id_str.isdigit():
+                raise ValidationError({"play": "Must be a play id"})
             queryset = queryset.filter(play_id=int(play_id_str))
 
+        if theatre_hall_id_str:
+            if not theatre_hall_id_str.isdigit():
+                raise ValidationError(
+                    {"theatre_hall": "Must be a theatre hall id"}
+                )
+            queryset = queryset.filter(theatre_hall_id=int(theatre_hall_id_str))
+
         return queryset
 
     def get_serializer_class(self):
@@ -152,37 +274,129 @@ class PerformanceViewSet(viewsets.ModelViewSet):
             return PerformanceListSerializer
         if self.action == "retrieve":
             return PerformanceDetailSerializer
+        if self.action == "seat_map":
+            return PerformanceSeatMapSerializer
+        if self.action == "bulk_schedule":
+            return PerformanceBulkScheduleSerializer
 
         return PerformanceSerializer
 
+    @action(
+        methods=["GET"],
+        detail=True,
+        url_path="seat-map",
+    )
+    def seat_map(self, request, pk=None):
+        """Endpoint for the compact seat occupancy bitmap of performance"""
+        performance = self.get_object()
+        serializer = self.get_serializer(performance)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="bulk",
+        permission_classes=[IsAdminOrIfAuthenticatedReadOnly],
+    )
+    def bulk_schedule(self, request):
+        """
+        Endpoint for scheduling many performances of a play in a hall,
+        from a list of show times or a recurrence, in one transaction
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = serializer.save()
+        if result["errors"] and not serializer.validated_data["skip_conflicts"]:
+            # Nothing is scheduled unless every performance fits
+            return Response(serializer.data, status=status.HTTP_400_BAD_REQUEST)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
-                "movie",
+                "play",
                 type=OpenApiTypes.INT,
-                description="Filter by movie id (ex. ?movie=2)",
+                description="Filter by play id (ex. ?play=2)",
+            ),
+            OpenApiParameter(
+                "theatre_hall",
+                type=OpenApiTypes.INT,
+                description="Filter by theatre hall id (ex. ?theatre_hall=2)",
             ),
             OpenApiParameter(
                 "date",
                 type=OpenApiTypes.DATE,
                 description=(
-                        "Filter by datetime of MovieSession "
+                        "Filter by date of Performance "
                         "(ex. ?date=2025-09-19)"
                 ),
             ),
         ]
     )
-
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return self.conditional_response(
+            request,
+            lambda: super(PerformanceViewSet, self).list(
+                request, *args, **kwargs
+            ),
+        )
 
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            request,
+            lambda: super(PerformanceViewSet, self).retrieve(
+                request, *args, **kwargs
+            ),
+            *args,
+            **kwargs,
+        )
 
-class ReservationViewSet(viewsets.ModelViewSet):
+    def get_conditional_state(self, request, *args, **kwargs):
+        queryset = self.filter_schedule(
+            Performance.objects.all(), request.query_params
+        )
+        if "pk" in kwargs:
+            queryset = queryset.filter(pk=kwargs["pk"])
+        state = queryset.aggregate(
+            last_modified=Max("updated_at"),
+            count=Count("id"),
+            tickets_sold=Sum("tickets_sold"),
+        )
+        # Play titles and hall names are part of the representation
+        fingerprint = (
+            state["last_modified"],
+            state["count"],
+            state["tickets_sold"],
+            get_catalogue_version(),
+        )
+        # No Last-Modified: deletes and catalogue edits do not move
+        # Max(updated_at), so If-Modified-Since would get stale 304s
+        return fingerprint, None
+
+
+class ReservationViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = Reservation.objects.prefetch_related(
-        "tickets__performance__play",
-        "tickets__performance__theatre_hall"
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related(
+                "performance__play", "performance__theatre_hall"
+            ).only(
+                "id",
+                "row",
+                "seat",
+                "reservation",
+                "performance__show_time",
+                "performance__tickets_sold",
+                "performance__play__title",
+                "performance__theatre_hall__name",
+                "performance__theatre_hall__rows",
+                "performance__theatre_hall__seats_in_row",
+            ),
+        )
     )
+    pagination_class = ReservationCursorPagination
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly, )
+    throttle_scopes = {"create": "reservations"}
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -190,7 +404,91 @@ class ReservationViewSet(viewsets.ModelViewSet):
         return ReservationSerializer
 
     def get_queryset(self):
-        return Reservation.objects.filter(user=self.request.user)
+        return self.queryset.filter(user=self.request.user)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class SeatHoldViewSet(
+    SerializerTimingMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Temporary seat locks of the current user, converted on checkout"""
+    queryset = SeatHold.objects.all()
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly, )
+    throttle_scopes = {"list": "seat_browsing", "create": "reservations"}
+
+    def get_serializer_class(self):
+        if self.action == "create":
+            return SeatHoldCreateSerializer
+        return SeatHoldSerializer
+
+    def get_queryset(self):
+        return self.queryset.filter(
+            user=self.request.user, expires_at__gt=timezone.now()
+        )
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        seat_holds = serializer.save(user=request.user)
+        return Response(
+            SeatHoldSerializer(seat_holds, many=True).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class RequestMetricsView(APIView):
+    """Per-view latency, DB time and query count histograms"""
+    permission_classes = (IsAdminUser, )
+    # Dashboards poll it, staff only already
+    throttle_classes = ()
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response(request_metrics.snapshot())
+
+
+class PrometheusMetricsView(APIView):
+    """Booking and request metrics of all workers in the Prometheus format"""
+    permission_classes = (IsAdminUser | HasMetricsToken, )
+    renderer_classes = (PrometheusTextRenderer, )
+    # Scrapers poll every few seconds, the token guards the endpoint
+    throttle_classes = ()
+
+    @extend_schema(responses=OpenApiTypes.STR)
+    def get(self, request):
+        return Response(registry.render())
+
+
+class SalesExportView(APIView):
+    """Streaming CSV / NDJSON export of sold tickets or reservations"""
+    permission_classes = (IsAdminUser, )
+    throttle_classes = ()
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "date_from",
+                type=OpenApiTypes.DATE,
+                description="Sold on or after (ex. ?date_from=2025-09-01)",
+            ),
+            OpenApiParameter(
+                "date_to",
+                type=OpenApiTypes.DATE,
+                description="Sold on or before (ex. ?date_to=2025-09-30)",
+            ),
+            OpenApiParameter(
+                "performance",
+                type=OpenApiTypes.INT,
+                description="Filter by performance id (ex. ?performance=2)",
+            ),
+        ],
+        responses=OpenApiTypes.BINARY,
+    )
+    def get(self, request, export, export_format):
+        return export_response(request, export, export_format)
@@ -0,0 +1,151 @@
+"""
+JWT authentication that remembers verified tokens, so repeated
+requests with the same access token skip the signature check and
+the user query.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+SNAPSHOT_FIELDS = ("id", "email", "is_staff", "is_active")
+
+
+class TokenUserCache:
+    """
+    Bounded LRU of raw token -> (validated token, user snapshot).
+    An entry lives for at most `ttl` seconds and never past the
+    expiry of its token.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._user_tokens = {}
+
+    def get(self, raw_token):
+        with self._lock:
+            entry = self._entries.get(raw_token)
+            if entry is None:
+                return None
+            expires_at, validated_token, snapshot = entry
+            if expires_at <= time.time():
+                self._discard(raw_token)
+                return None
+            self._entries.move_to_end(raw_token)
+        return snapshot_user(snapshot), validated_token
+
+    def set(self, raw_token, validated_token, user):
+        snapshot = tuple(getattr(user, field) for field in SNAPSHOT_FIELDS)
+        expires_at = min(time.time() + self.ttl, validated_token["exp"])
+        with self._lock:
+            self._discard(raw_token)
+            self._entries[raw_token] = (expires_at, validated_token, snapshot)
+            self._user_tokens.setdefault(user.pk, set()).add(raw_token)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for raw_token in list(self._user_tokens.get(user_id, ())):
+                self._discard(raw_token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_tokens.clear()
+
+    def _discard(self, raw_token):
+        entry = self._entries.pop(raw_token, None)
+        if entry is None:
+            return
+        user_id = entry[2][0]
+        tokens = self._user_tokens.get(user_id)
+        if tokens is not None:
+            tokens.discard(raw_token)
+            if not tokens:
+                del self._user_tokens[user_id]
+
+
+def snapshot_user(snapshot):
+    """
+    A user instance with only the snapshot fields loaded. Other fields
+    are deferred, so reading one queries the DB and saving it only
+    writes the loaded fields.
+    """
+    user_model = get_user_model()
+    values = dict(zip(SNAPSHOT_FIELDS, snapshot))
+    # from_db expects the loaded values in model field order
+    field_names = [
+        field.attname
+        for field in user_model._meta.concrete_fields
+        if field.attname in values
+    ]
+    return user_model.from_db(
+        "default", field_names, [values[name] for name in field_names]
+    )
+
+
+# Snapshot flags only follow saves made in the same process: queryset
+# .update() calls and other workers' saves reach a cached snapshot once
+# its entry expires, so a deactivated or demoted user keeps its old
+# privileges for at most this many seconds
+MAX_CACHE_TTL = 300
+
+_token_user_cache = None
+_token_user_cache_lock = threading.Lock()
+
+
+def get_token_user_cache():
+    """The process cache, built from the settings on first use"""
+    global _token_user_cache
+    user_cache = _token_user_cache
+    if user_cache is None:
+        with _token_user_cache_lock:
+            if _token_user_cache is None:
+                _token_user_cache = TokenUserCache(
+                    max_size=settings.JWT_AUTH_CACHE_SIZE,
+                    ttl=min(
+                        settings.JWT_AUTH_CACHE_TTL,
+                        MAX_CACHE_TTL,
+                        settings.SIMPLE_JWT[
+                            "ACCESS_TOKEN_LIFETIME"
+                        ].total_seconds(),
+                    ),
+                )
+            user_cache = _token_user_cache
+    return user_cache
+
+
+def reset_token_user_cache():
+    global _token_user_cache
+    with _token_user_cache_lock:
+        _token_user_cache = None
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that serves repeated tokens from the token cache"""
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        user_cache = get_token_user_cache()
+        cached = user_cache.get(raw_token)
+        if cached is not None:
+            return cached
+
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+        user_cache.set(raw_token, validated_token, user)
+        return user, validated_token
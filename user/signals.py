@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import get_token_user_cache, reset_token_user_cache
+
+TOKEN_CACHE_SETTINGS = (
+    "JWT_AUTH_CACHE_SIZE",
+    "JWT_AUTH_CACHE_TTL",
+    "SIMPLE_JWT",
+)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_tokens(sender, instance, **kwargs):
+    # Staff and active flags of cached snapshots must follow the user
+    get_token_user_cache().invalidate_user(instance.pk)
+
+
+@receiver(setting_changed)
+def rebuild_token_cache(setting, **kwargs):
+    if setting in TOKEN_CACHE_SETTINGS:
+        reset_token_user_cache()
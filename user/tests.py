@@ -1,3 +1,84 @@
-from django.test import TestCase
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import TokenUserCache, get_token_user_cache
+
+
+@mock.patch.dict(
+    SimpleRateThrottle.THROTTLE_RATES,
+    {scope: None for scope in SimpleRateThrottle.THROTTLE_RATES},
+)
+class CachedJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_token_user_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            email="admin@example.com", password="pass1234"
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+
+    def test_repeated_token_skips_user_query(self):
+        self.client.get("/api/theatre/genres/")
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/theatre/genres/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(JWT_AUTH_CACHE_TTL=0)
+    def test_cache_follows_settings(self):
+        self.client.get("/api/theatre/genres/")
+        with self.assertNumQueries(2):
+            self.client.get("/api/theatre/genres/")
+
+    def test_user_change_invalidates_cached_token(self):
+        response = self.client.post("/api/theatre/genres/", {"name": "Drama"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.post("/api/theatre/genres/", {"name": "Opera"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_manage_user_updates_full_user(self):
+        self.client.get("/api/theatre/genres/")
+        response = self.client.patch(
+            "/api/user/me/", {"email": "new@example.com"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, "new@example.com")
+        self.assertTrue(self.user.check_password("pass1234"))
+
+
+class TokenUserCacheTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="user@example.com", password="pass1234"
+        )
+
+    def test_entry_does_not_outlive_token(self):
+        user_cache = TokenUserCache(max_size=10, ttl=60)
+        token = AccessToken.for_user(self.user)
+        token["exp"] = int(time.time()) - 1
+        user_cache.set(b"token", token, self.user)
+        self.assertIsNone(user_cache.get(b"token"))
+
+    def test_least_recently_used_entry_evicted(self):
+        user_cache = TokenUserCache(max_size=2, ttl=60)
+        for raw_token in (b"first", b"second"):
+            user_cache.set(raw_token, AccessToken.for_user(self.user), self.user)
+        user_cache.get(b"first")
+        user_cache.set(b"third", AccessToken.for_user(self.user), self.user)
+        self.assertIsNone(user_cache.get(b"second"))
+        user, _ = user_cache.get(b"first")
+        self.assertEqual(user.email, "user@example.com")
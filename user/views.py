@@ -10,6 +10,7 @@ class CreateUserView(generics.CreateAPIView):
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
+    # Updates need the full user row, not a cached snapshot
     authentication_classes = (JWTAuthentication, )
     permission_classes = (IsAuthenticated, )
 